@@ -3,7 +3,13 @@
 # Description: Provided data structures necessary to complete the assignment.
 #              Please look through this file carefully to see what methods
 #              are available and how they're implemented.
-#              Don't modify the contents of this file.
+
+
+from array import array
+from bisect import bisect_left
+from hashlib import blake2b
+from itertools import islice
+from os import urandom
 
 
 # -------------- Used by both HashMaps (SC & OA)  -------------- #
@@ -96,6 +102,207 @@ def hash_function_2(key: str) -> int:
     return hash
 
 
+# The hash functions below all return non-negative 64-bit integers
+HASH_MASK = (1 << 64) - 1
+
+_FNV_OFFSET_BASIS = 0xcbf29ce484222325
+_FNV_PRIME = 0x100000001b3
+
+
+def hash_function_builtin(key: str) -> int:
+    """
+    Hash function wrapping Python's built-in hash; computed in C and cached
+    on str objects, so it is the fastest choice. String hashes are
+    randomized per process unless PYTHONHASHSEED is set.
+    """
+    return hash(key) & HASH_MASK
+
+
+def hash_function_fnv1a(key: str) -> int:
+    """
+    64-bit FNV-1a hash over the UTF-8 bytes of the key. Unlike the sample
+    functions it depends on character order, so anagrams do not collide,
+    and it is stable across processes.
+    """
+    hash = _FNV_OFFSET_BASIS
+    for byte in key.encode():
+        hash = ((hash ^ byte) * _FNV_PRIME) & HASH_MASK
+    return hash
+
+
+def make_seeded_hash_function(seed: bytes = None) -> callable:
+    """
+    Return a hash function keyed with the given seed (random if omitted)
+    using 64-bit BLAKE2b. Without the seed, colliding keys cannot be
+    precomputed, which protects a HashMap against hash-flooding input.
+    """
+    secret = urandom(16) if seed is None else seed
+
+    def hash_function_seeded(key: str) -> int:
+        """Keyed BLAKE2b hash of the UTF-8 bytes of the key"""
+        digest = blake2b(key.encode(), digest_size=8, key=secret).digest()
+        return int.from_bytes(digest, 'little')
+
+    return hash_function_seeded
+
+
+def cache_hash_function(function: callable,
+                        max_entries: int = 65536) -> callable:
+    """
+    Return a version of function that remembers the hash of each key it has
+    seen, so a key is only hashed once however often it is put, looked up
+    or moved by a resize. When the cache reaches max_entries, the half of
+    the keys that were cached first is forgotten and the rest kept, so
+    only maps of up to about max_entries keys avoid hashing again.
+    """
+    cache = {}
+    evict = max(1, max_entries // 2)
+
+    def cached_hash_function(key: str) -> int:
+        """Return the cached hash of key, computing it on first use"""
+        value = cache.get(key)
+        if value is None:
+            if len(cache) >= max_entries:
+                # Dicts keep insertion order, so these are the oldest keys
+                for old_key in list(islice(cache, evict)):
+                    del cache[old_key]
+            value = cache[key] = function(key)
+        return value
+
+    return cached_hash_function
+
+
+# Capacities a HashMap of the default capacity 11 passes through as it
+# doubles: each entry is the smallest prime above twice the one before, so
+# there is no prime between 2 * GROWTH_PRIMES[i - 1] and GROWTH_PRIMES[i]
+GROWTH_PRIMES = (
+    11, 23, 47, 97, 197, 397, 797, 1597, 3203, 6421, 12853, 25717, 51437,
+    102877, 205759, 411527, 823117, 1646237, 3292489, 6584983, 13169977,
+    26339969, 52679969, 105359939, 210719881, 421439783, 842879579,
+    1685759167, 3371518343, 6743036717, 13486073473, 26972146961,
+    53944293929, 107888587883, 215777175787, 431554351609, 863108703229,
+    1726217406467,
+)
+
+# Witnesses that make Miller-Rabin exact for every number below 3.3 * 10**24
+# (3,317,044,064,679,887,385,961,981); without 41 the bound is only 3.18 *
+# 10**23
+_MILLER_RABIN_BASES = (2, 3, 5, 7, 11, 13, 17, 19, 23, 29, 31, 37, 41)
+
+
+def is_prime(number: int) -> bool:
+    """
+    Determine if given integer is a prime number using the deterministic
+    Miller-Rabin test, in O(log(number)) multiplications instead of the
+    O(sqrt(number)) divisions of trial division.
+    """
+    if number < 2:
+        return False
+    for base in _MILLER_RABIN_BASES:
+        if number % base == 0:
+            return number == base
+    if number < 41 * 41:
+        return True
+
+    # Write number - 1 as odd * 2 ** twos
+    odd, twos = number - 1, 0
+    while odd % 2 == 0:
+        odd //= 2
+        twos += 1
+
+    # The first four bases are already exact below 3,215,031,751
+    bases = _MILLER_RABIN_BASES[:4] if number < 3215031751 \
+        else _MILLER_RABIN_BASES
+    for base in bases:
+        x = pow(base, odd, number)
+        if x == 1 or x == number - 1:
+            continue
+        for _ in range(twos - 1):
+            x = x * x % number
+            if x == number - 1:
+                break
+        else:
+            return False
+    return True
+
+
+def next_prime(number: int) -> int:
+    """
+    Return the smallest prime that is at least number, rounding even
+    numbers up first (so 2 gives 3). Capacities on the GROWTH_PRIMES
+    sequence, and the doubled capacities that lead to them, are looked up
+    without any primality tests.
+    """
+    if number % 2 == 0:
+        number += 1
+
+    index = bisect_left(GROWTH_PRIMES, number)
+    if index < len(GROWTH_PRIMES) and (
+            GROWTH_PRIMES[index] == number or
+            (index > 0 and number >= 2 * GROWTH_PRIMES[index - 1])):
+        return GROWTH_PRIMES[index]
+
+    while not is_prime(number):
+        number += 2
+    return number
+
+
+class HashMapStats:
+    """
+    Statistics of a HashMap on which enable_stats has been called.
+
+    The counters are kept up to date as the map is used: puts, gets
+    (including contains_key), removes and upserts (increment, setdefault
+    and update_with) count keys, so a batch of n keys counts n; resizes
+    counts every change of capacity and resize_seconds the time spent
+    moving entries, incremental migration steps included.
+
+    The shape of the table is worked out by get_stats, from the table as it
+    is at that moment: for the SC map, chain_lengths[n] is the number of
+    buckets holding n keys; for the OA map, probe_lengths[n] is the number
+    of keys that get finds on its n-th probe, and tombstones the number of
+    tombstones in the table. The histograms not kept by a map are None.
+    """
+    __slots__ = ('puts', 'gets', 'removes', 'upserts', 'resizes',
+                 'resize_seconds', 'chain_lengths', 'probe_lengths',
+                 'tombstones')
+
+    def __init__(self) -> None:
+        """Initialize all counters to zero."""
+        self.puts = 0
+        self.gets = 0
+        self.removes = 0
+        self.upserts = 0
+        self.resizes = 0
+        self.resize_seconds = 0.0
+        self.chain_lengths = None
+        self.probe_lengths = None
+        self.tombstones = 0
+
+    def __str__(self) -> str:
+        """Override string method to provide more readable output."""
+        out = (f"puts: {self.puts} gets: {self.gets} "
+               f"removes: {self.removes} upserts: {self.upserts} "
+               f"resizes: {self.resizes} "
+               f"resize seconds: {self.resize_seconds:.6f}")
+        if self.chain_lengths is not None:
+            out += f"\nchain lengths: {self.chain_lengths}"
+        if self.probe_lengths is not None:
+            out += (f"\nprobe lengths: {self.probe_lengths} "
+                    f"tombstones: {self.tombstones}")
+        return out
+
+
+def add_to_histogram(histogram: DynamicArray, value: int) -> None:
+    """
+    Add one to the count at index value of the histogram, extending it
+    with zero counts as needed.
+    """
+    while histogram.length() <= value:
+        histogram.append(0)
+    histogram[value] = histogram[value] + 1
+
+
 # --------- For use in Separate Chaining (SC) HashMap  --------- #
 
 class SLNode:
@@ -103,11 +310,16 @@ class SLNode:
     Singly Linked List node for use in a hash map
     """
 
-    def __init__(self, key: str, value: object, next: "SLNode" = None) -> None:
-        """Initialize node given a key and value."""
+    def __init__(self, key: str, value: object, next: "SLNode" = None,
+                 hash: int = None) -> None:
+        """
+        Initialize node given a key and value, and optionally the full hash
+        of the key so it never has to be recomputed.
+        """
         self.key = key
         self.value = value
         self.next = next
+        self.hash = hash
 
     def __str__(self) -> str:
         """Override string method to provide more readable output."""
@@ -141,7 +353,8 @@ class LinkedListIterator:
 class LinkedList:
     """
     Class implementing a Singly Linked List
-    Supported methods are: insert, remove, contains, length, iterator
+    Supported methods are: insert, remove, contains, find, find_or_insert,
+    unlink, length, iterator
     """
 
     def __init__(self) -> None:
@@ -168,29 +381,38 @@ class LinkedList:
         """Return an iterator for the list, starting at the head."""
         return LinkedListIterator(self._head)
 
-    def insert(self, key: str, value: object) -> None:
-        """Insert new node at front of the list."""
-        self._head = SLNode(key, value, self._head)
+    def insert(self, key: str, value: object, hash: int = None) -> SLNode:
+        """Insert new node at front of the list and return it."""
+        self._head = SLNode(key, value, self._head, hash)
         self._size += 1
+        return self._head
 
-    def remove(self, key: str) -> bool:
+    def remove(self, key: str, hash: int = None) -> bool:
         """
-        Remove first node with matching key.
+        Remove first node with matching key (and cached hash, if given).
         Return True if removal was successful, False otherwise.
         """
+        return self.unlink(key, hash) is not None
+
+    def unlink(self, key: str, hash: int = None) -> SLNode:
+        """
+        Remove first node with matching key (and cached hash, if given) in
+        the same pass that finds it. Return the removed node, or None if no
+        match.
+        """
         previous, node = None, self._head
         while node:
 
-            if node.key == key:
+            if (hash is None or node.hash == hash) and node.key == key:
                 if previous:
                     previous.next = node.next
                 else:
                     self._head = node.next
                 self._size -= 1
-                return True
+                return node
 
             previous, node = node, node.next
-        return False
+        return None
 
     def contains(self, key: str) -> SLNode:
         """Return node with matching key, or None if no match"""
@@ -201,19 +423,326 @@ class LinkedList:
             node = node.next
         return node
 
+    def find(self, key: str, hash: int, move_to_front: bool = False) \
+            -> SLNode:
+        """
+        Return node with matching key and cached hash, or None if no match.
+        Comparing hashes first rules out most other keys without comparing
+        strings. With move_to_front, a matching node is also moved to the
+        head, so keys that are looked up often stay near the front.
+        """
+        previous, node = None, self._head
+        while node:
+            if node.hash == hash and node.key == key:
+                if move_to_front and previous:
+                    previous.next = node.next
+                    node.next = self._head
+                    self._head = node
+                return node
+            previous, node = node, node.next
+        return None
+
+    def find_or_insert(self, key: str, hash: int, value: object = None,
+                       move_to_front: bool = False) -> tuple:
+        """
+        Return a tuple of the node with matching key and cached hash, and
+        True, after moving it to the head if move_to_front is set; if there
+        is no match, insert a node holding value at the front instead, in
+        the same pass, and return it and False.
+        """
+        previous, node = None, self._head
+        while node:
+            if node.hash == hash and node.key == key:
+                if move_to_front and previous:
+                    previous.next = node.next
+                    node.next = self._head
+                    self._head = node
+                return node, True
+            previous, node = node, node.next
+        return self.insert(key, value, hash), False
+
     def length(self) -> int:
         """Return the length of the list."""
         return self._size
 
 
+class TreeNode(SLNode):
+    """
+    Node of a TreeBucket: an SLNode that is also a node of an AVL tree
+    ordered by (hash, key), and keeps a link to the previous node of the
+    list so that it can be unlinked without walking the list.
+    """
+
+    def __init__(self, key: str, value: object, next: "TreeNode" = None,
+                 hash: int = None) -> None:
+        """Initialize a node that is not yet linked into a tree."""
+        super().__init__(key, value, next, hash)
+        self.previous = None
+        self.left = None
+        self.right = None
+        self.height = 1
+
+
+class TreeBucket:
+    """
+    Bucket holding its nodes in an AVL tree ordered by (hash, key), for
+    chains too long to search one node at a time: find, insert and remove
+    take O(log n) steps however many keys share the bucket, or even the
+    same hash. Keys sharing a hash must be comparable with each other,
+    as strings are.
+
+    The nodes are also kept in a doubly linked list in the order a
+    LinkedList would hold them (newest first), so the bucket iterates,
+    prints and converts back to a LinkedList exactly as the chain it
+    replaced would have.
+    """
+
+    def __init__(self, chain: LinkedList = None) -> None:
+        """
+        Initialize a bucket holding the nodes of the given chain, if any,
+        in the same order.
+        """
+        self._head = None
+        self._root = None
+        self._size = 0
+        if chain is None:
+            return
+
+        # Link copies of the chain's nodes in the same order
+        last = None
+        for node in chain:
+            tree_node = TreeNode(node.key, node.value, None, node.hash)
+            if last is None:
+                self._head = tree_node
+            else:
+                last.next = tree_node
+                tree_node.previous = last
+            last = tree_node
+            self._root = self._add(self._root, tree_node)
+            self._size += 1
+
+    def __str__(self) -> str:
+        """Override string method to provide more readable output."""
+        if not self._head:
+            return "TREE []"
+
+        content = str(self._head)
+        node = self._head.next
+        while node:
+            content += ' -> ' + str(node)
+            node = node.next
+        return 'TREE [' + content + ']'
+
+    def __iter__(self) -> LinkedListIterator:
+        """Return an iterator for the nodes, newest first."""
+        return LinkedListIterator(self._head)
+
+    def insert(self, key: str, value: object, hash: int = None) -> TreeNode:
+        """
+        Insert new node, which must not already be in the bucket, and
+        return it.
+        """
+        node = TreeNode(key, value, self._head, hash)
+        if self._head:
+            self._head.previous = node
+        self._head = node
+        self._root = self._add(self._root, node)
+        self._size += 1
+        return node
+
+    def find(self, key: str, hash: int, move_to_front: bool = False) \
+            -> TreeNode:
+        """
+        Return node with matching key and hash, or None if no match.
+        move_to_front is accepted as LinkedList.find accepts it, and
+        ignored: the tree's shape, not the list order, decides how far a
+        search goes.
+        """
+        node = self._root
+        while node:
+            if hash == node.hash and key == node.key:
+                return node
+            if hash < node.hash or (hash == node.hash and key < node.key):
+                node = node.left
+            else:
+                node = node.right
+        return None
+
+    def find_or_insert(self, key: str, hash: int, value: object = None,
+                       move_to_front: bool = False) -> tuple:
+        """
+        Return a tuple of the node with matching key and hash, and True; if
+        there is no match, insert a node holding value instead and return
+        it and False. move_to_front is ignored, as by find.
+        """
+        node = self.find(key, hash)
+        if node is not None:
+            return node, True
+        return self.insert(key, value, hash), False
+
+    def remove(self, key: str, hash: int = None) -> bool:
+        """
+        Remove node with matching key, using its hash to find it if given.
+        Return True if removal was successful, False otherwise.
+        """
+        return self.unlink(key, hash) is not None
+
+    def unlink(self, key: str, hash: int = None) -> TreeNode:
+        """
+        Remove node with matching key, using its hash to find it if given.
+        Return the removed node, or None if no match.
+        """
+        if hash is None:
+            node = self._head
+            while node and node.key != key:
+                node = node.next
+        else:
+            node = self.find(key, hash)
+        if node is None:
+            return None
+
+        self._root = self._delete(self._root, node)
+        if node.previous:
+            node.previous.next = node.next
+        else:
+            self._head = node.next
+        if node.next:
+            node.next.previous = node.previous
+        self._size -= 1
+        return node
+
+    def contains(self, key: str) -> TreeNode:
+        """Return node with matching key, or None if no match"""
+        node = self._head
+        while node and node.key != key:
+            node = node.next
+        return node
+
+    def length(self) -> int:
+        """Return the number of nodes in the bucket."""
+        return self._size
+
+    def to_chain(self) -> LinkedList:
+        """Return a LinkedList holding the bucket's pairs in the same order."""
+        nodes = []
+        node = self._head
+        while node:
+            nodes.append(node)
+            node = node.next
+        chain = LinkedList()
+        for node in reversed(nodes):
+            chain.insert(node.key, node.value, node.hash)
+        return chain
+
+    # AVL tree helpers: each returns the new root of the subtree it changed
+
+    @staticmethod
+    def _height(node: TreeNode) -> int:
+        """Return the height of the subtree, 0 if empty."""
+        return node.height if node else 0
+
+    @classmethod
+    def _rotate_right(cls, node: TreeNode) -> TreeNode:
+        """Rotate the subtree right around its left child."""
+        top = node.left
+        node.left = top.right
+        top.right = node
+        node.height = 1 + max(cls._height(node.left), cls._height(node.right))
+        top.height = 1 + max(cls._height(top.left), node.height)
+        return top
+
+    @classmethod
+    def _rotate_left(cls, node: TreeNode) -> TreeNode:
+        """Rotate the subtree left around its right child."""
+        top = node.right
+        node.right = top.left
+        top.left = node
+        node.height = 1 + max(cls._height(node.left), cls._height(node.right))
+        top.height = 1 + max(node.height, cls._height(top.right))
+        return top
+
+    @classmethod
+    def _rebalance(cls, node: TreeNode) -> TreeNode:
+        """
+        Update the height of the subtree after one of its children changed
+        height by at most one, rotating if it has become unbalanced.
+        """
+        left = cls._height(node.left)
+        right = cls._height(node.right)
+        if left > right + 1:
+            if cls._height(node.left.left) < cls._height(node.left.right):
+                node.left = cls._rotate_left(node.left)
+            return cls._rotate_right(node)
+        if right > left + 1:
+            if cls._height(node.right.right) < cls._height(node.right.left):
+                node.right = cls._rotate_right(node.right)
+            return cls._rotate_left(node)
+        node.height = 1 + max(left, right)
+        return node
+
+    @classmethod
+    def _add(cls, node: TreeNode, new: TreeNode) -> TreeNode:
+        """Add the new node to the subtree."""
+        if node is None:
+            return new
+        if new.hash < node.hash or \
+                (new.hash == node.hash and new.key < node.key):
+            node.left = cls._add(node.left, new)
+        else:
+            node.right = cls._add(node.right, new)
+        return cls._rebalance(node)
+
+    @classmethod
+    def _remove_first(cls, node: TreeNode) -> tuple:
+        """
+        Take the first node out of the subtree. Return the new root of the
+        subtree and the node taken out.
+        """
+        if node.left is None:
+            return node.right, node
+        node.left, first = cls._remove_first(node.left)
+        return cls._rebalance(node), first
+
+    @classmethod
+    def _delete(cls, node: TreeNode, target: TreeNode) -> TreeNode:
+        """
+        Take the target node, which is in the subtree, out of it. Nodes are
+        relinked rather than having their contents swapped, so every key
+        stays in the node that the list links to.
+        """
+        if target is node:
+            if node.left is None:
+                return node.right
+            if node.right is None:
+                return node.left
+            right, successor = cls._remove_first(node.right)
+            successor.left = node.left
+            successor.right = right
+            node.left = node.right = None
+            node.height = 1
+            return cls._rebalance(successor)
+
+        if target.hash < node.hash or \
+                (target.hash == node.hash and target.key < node.key):
+            node.left = cls._delete(node.left, target)
+        else:
+            node.right = cls._delete(node.right, target)
+        return cls._rebalance(node)
+
+
 # ---------- For use in Open Addressing (OA) HashMap  ---------- #
 
 class HashEntry:
+    __slots__ = ('key', 'value', 'hash', 'is_tombstone')
 
-    def __init__(self, key: str, value: object) -> None:
-        """Initialize an entry for use in a hash map."""
+    def __init__(self, key: str, value: object, hash: int = None) -> None:
+        """
+        Initialize an entry for use in a hash map, optionally with the full
+        hash of the key so it never has to be recomputed.
+        """
         self.key = key
         self.value = value
+        self.hash = hash
 
         # Set this value to True when you "delete" a HashEntry
         self.is_tombstone = False
@@ -221,3 +750,118 @@ class HashEntry:
     def __str__(self) -> str:
         """Override string method to provide more readable output."""
         return f"K: {self.key} V: {self.value} TS: {self.is_tombstone}"
+
+
+class CompactEntry:
+    """
+    Lightweight view of one slot of a CompactEntryArray, offering the same
+    attributes as HashEntry. Writes go straight to the underlying arrays.
+    """
+    __slots__ = ('_array', '_index')
+
+    def __init__(self, compact_array: "CompactEntryArray", index: int) -> None:
+        """Initialize a view of the slot at the given index."""
+        self._array = compact_array
+        self._index = index
+
+    @property
+    def key(self) -> str:
+        """Key stored in the slot."""
+        return self._array._keys[self._index]
+
+    @property
+    def value(self) -> object:
+        """Value stored in the slot."""
+        return self._array._values[self._index]
+
+    @value.setter
+    def value(self, value: object) -> None:
+        self._array._values[self._index] = value
+
+    @property
+    def hash(self) -> int:
+        """Cached hash of the key stored in the slot."""
+        return self._array._hashes[self._index]
+
+    @property
+    def is_tombstone(self) -> bool:
+        """True if the slot holds a deleted entry."""
+        return self._array._states[self._index] == CompactEntryArray.TOMBSTONE
+
+    @is_tombstone.setter
+    def is_tombstone(self, is_tombstone: bool) -> None:
+        self._array._states[self._index] = CompactEntryArray.TOMBSTONE \
+            if is_tombstone else CompactEntryArray.LIVE
+
+    def __str__(self) -> str:
+        """Override string method to provide more readable output."""
+        return f"K: {self.key} V: {self.value} TS: {self.is_tombstone}"
+
+
+class CompactEntryArray:
+    """
+    Fixed-size table of hash entries stored as parallel arrays of hashes,
+    keys and values plus one state byte per slot, instead of one HashEntry
+    object per slot. Supports the DynamicArray methods used by the OA
+    HashMap: reading a slot returns None or a CompactEntry view, and
+    writing a slot copies the fields of the given entry.
+    Hashes must be non-negative 64-bit integers (see HASH_MASK).
+    """
+    EMPTY, LIVE, TOMBSTONE = 0, 1, 2
+
+    def __init__(self, capacity: int) -> None:
+        """Initialize a table of the given number of empty slots."""
+        self._hashes = array('Q', bytes(8 * capacity))
+        self._keys = [None] * capacity
+        self._values = [None] * capacity
+        self._states = bytearray(capacity)
+
+    def __iter__(self):
+        """Disable iterator capability, as for DynamicArray."""
+        return None
+
+    def __str__(self) -> str:
+        """Override string method to provide more readable output."""
+        return '[' + ', '.join(str(self[index])
+                               for index in range(self.length())) + ']'
+
+    def get_at_index(self, index: int) -> CompactEntry:
+        """Return a view of the entry at a given index, or None if empty."""
+        if index < 0 or index >= self.length():
+            raise DynamicArrayException
+        if self._states[index] == self.EMPTY:
+            return None
+        return CompactEntry(self, index)
+
+    def __getitem__(self, index: int) -> CompactEntry:
+        """Return the entry at a given index using [] syntax."""
+        return self.get_at_index(index)
+
+    def set_at_index(self, index: int, entry: HashEntry) -> None:
+        """Store the fields of entry (or clear the slot for None)."""
+        if index < 0 or index >= self.length():
+            raise DynamicArrayException
+        if entry is None:
+            self._hashes[index] = 0
+            self._keys[index] = None
+            self._values[index] = None
+            self._states[index] = self.EMPTY
+        else:
+            self._hashes[index] = entry.hash or 0
+            self._keys[index] = entry.key
+            self._values[index] = entry.value
+            self._states[index] = self.TOMBSTONE if entry.is_tombstone \
+                else self.LIVE
+
+    def __setitem__(self, index: int, entry: HashEntry) -> None:
+        """Store an entry at a given index using [] syntax."""
+        self.set_at_index(index, entry)
+
+    def swap(self, i: int, j: int) -> None:
+        """Swap the entries of two slots given their indices."""
+        for column in (self._hashes, self._keys, self._values, self._states):
+            column[i], column[j] = column[j], column[i]
+
+    def length(self) -> int:
+        """Return the number of slots."""
+        return len(self._states)
@@ -0,0 +1,833 @@
+# Description: Micro-benchmarks for the SC and OA HashMap implementations.
+#              Run as `python benchmark.py <name> [sizes...]`; with no name
+#              every benchmark runs at its default sizes.
+
+import gc
+import random
+import sys
+from bisect import bisect_left
+import threading
+import time
+import tracemalloc
+
+from a6_include import (GROWTH_PRIMES, HASH_MASK, DynamicArray, LinkedList,
+                        cache_hash_function, hash_function_1,
+                        hash_function_2, hash_function_builtin,
+                        hash_function_fnv1a, make_seeded_hash_function,
+                        next_prime)
+from benchmark_keys import anagram_keys, percentile, zipfian_keys
+import hash_map_concurrent
+import hash_map_oa
+import hash_map_sc
+import hash_map_sharded
+
+
+def _timed(func, *args) -> float:
+    """
+    Returns the number of seconds taken by a single call of func(*args).
+    """
+    start = time.perf_counter()
+    func(*args)
+    return time.perf_counter() - start
+
+
+def _format_size(size: int) -> str:
+    """
+    Returns a short label (1k, 100k, 1M) for the given number of keys.
+    """
+    if size >= 1000000 and size % 1000000 == 0:
+        return str(size // 1000000) + 'M'
+    if size >= 1000 and size % 1000 == 0:
+        return str(size // 1000) + 'k'
+    return str(size)
+
+
+# ------------------- OA LOOKUP ------------------------------------------- #
+
+def _linear_scan_get(m: hash_map_oa.HashMap, key: str) -> object:
+    """
+    Lookup as done before get followed the probe sequence: every slot in
+    the table is visited until a live entry with the key is found.
+    """
+    buckets = m._buckets
+    for index in range(buckets.length()):
+        if buckets[index] is not None:
+            if buckets[index].key == key and buckets[index].is_tombstone \
+                    is False:
+                return buckets[index].value
+    return None
+
+
+def bench_oa_lookup(sizes=(1000, 100000, 1000000)) -> None:
+    """
+    Compares per-lookup latency of the linear-scan get against the
+    probe-sequence get on the open addressing HashMap.
+    """
+    print("\nOA lookup latency (microseconds per get)")
+    print("size     linear scan      probe sequence   speedup")
+    for size in sizes:
+        m = hash_map_oa.HashMap(11, hash_function_2)
+        for i in range(size):
+            m.put('key' + str(i), i)
+
+        # The linear scan is O(capacity), so sample fewer keys as maps grow
+        samples = max(3, min(1000, 1000000 // size))
+        step = max(1, size // samples)
+        keys = ['key' + str(i) for i in range(0, size, step)][:samples]
+
+        def run(get):
+            for key in keys:
+                get(key)
+
+        old = _timed(run, lambda key: _linear_scan_get(m, key)) / len(keys)
+        new = _timed(run, m.get) / len(keys)
+        print(f"{_format_size(size):<8} {old * 1e6:>14.2f}   "
+              f"{new * 1e6:>14.2f}   {old / new:>7.1f}x")
+
+
+# ------------------- PUT LATENCY ----------------------------------------- #
+
+def bench_put_latency(sizes=(100000, 1000000)) -> None:
+    """
+    Reports put latency percentiles while a map grows from its default
+    capacity, with stop-the-world and incremental resizing. Uses the
+    built-in hash so that chain lengths do not drown out resize cost, and
+    disables the garbage collector (as timeit does) so that its pauses are
+    not mistaken for resize spikes.
+    """
+    print("\nput latency while growing (microseconds)")
+    print("map  resize        size     p50      p99       max")
+    for size in sizes:
+        keys = ['key' + str(i) for i in range(size)]
+        for label, module in (('SC', hash_map_sc), ('OA', hash_map_oa)):
+            for incremental in (False, True):
+                m = module.HashMap(11, hash_function_builtin,
+                                   incremental=incremental)
+                latencies = []
+                clock = time.perf_counter
+                gc.disable()
+                for key in keys:
+                    start = clock()
+                    m.put(key, None)
+                    latencies.append(clock() - start)
+                gc.enable()
+
+                mode = 'incremental' if incremental else 'full'
+                print(f"{label:<4} {mode:<12} {_format_size(size):<8} "
+                      f"{percentile(latencies, 0.5) * 1e6:>6.1f} "
+                      f"{percentile(latencies, 0.99) * 1e6:>8.1f} "
+                      f"{max(latencies) * 1e6:>9.0f}")
+
+
+# ------------------- HASH FUNCTIONS -------------------------------------- #
+
+def bench_hash_functions(sizes=(10000, 100000)) -> None:
+    """
+    Reports the cost per call of each hash function and the longest chain
+    it produces in a separate chaining HashMap filled with anagram keys.
+    """
+    functions = (
+        ('hash_function_1', hash_function_1),
+        ('hash_function_2', hash_function_2),
+        ('builtin', hash_function_builtin),
+        ('fnv1a', hash_function_fnv1a),
+        ('seeded', make_seeded_hash_function()),
+        ('fnv1a cached', cache_hash_function(hash_function_fnv1a)),
+    )
+    print("\nhash functions on anagram keys")
+    print("function          size     ns/call   longest chain")
+    for size in sizes:
+        keys = anagram_keys(size)
+        for name, function in functions:
+
+            def run():
+                for key in keys:
+                    function(key)
+
+            # Cached functions are measured on their warm path
+            run()
+            per_call = _timed(run) / size
+
+            m = hash_map_sc.HashMap(11, function)
+            for key in keys:
+                m.put(key, None)
+            longest = 0
+            for index in range(m.get_capacity()):
+                bucket = m._buckets[index]
+                if bucket is not None and bucket.length() > longest:
+                    longest = bucket.length()
+
+            print(f"{name:<17} {_format_size(size):<8} "
+                  f"{per_call * 1e9:>7.0f}   {longest:>13}")
+
+
+# ------------------- CACHED HASHES --------------------------------------- #
+
+def _rehash_resize(m, new_capacity: int) -> None:
+    """
+    Resize as done before entries cached their hash: every entry is put
+    into a fresh map, recomputing the hash of its key.
+    """
+    resized = type(m)(new_capacity, m._hash_function)
+    pairs = m.get_keys_and_values()
+    for index in range(pairs.length()):
+        resized.put(pairs[index][0], pairs[index][1])
+    m._buckets = resized._buckets
+    m._capacity = resized._capacity
+
+
+def _uncached_sc_get(m, key: str) -> object:
+    """
+    SC lookup as done before nodes cached their hash: every node in the
+    chain has its key compared.
+    """
+    bucket = m._buckets[m._hash_function(key) % m._capacity]
+    for node in bucket:
+        if node.key == key:
+            return node.value
+    return None
+
+
+def _uncached_oa_get(m, key: str) -> object:
+    """
+    OA lookup as done before entries cached their hash: every entry on the
+    probe sequence has its key compared.
+    """
+    index = m._hash_function(key) % m._capacity
+    quad_probe = index
+    j = 1
+    while m._buckets[quad_probe] is not None:
+        entry = m._buckets[quad_probe]
+        if entry.key == key and entry.is_tombstone is False:
+            return entry.value
+        quad_probe = (index + j**2) % m._capacity
+        j += 1
+    return None
+
+
+def bench_cached_hash(sizes=(10000, 100000)) -> None:
+    """
+    Compares resize and lookup time with and without the hash cached on
+    SLNode/HashEntry, using long keys that share a common prefix and the
+    pure Python FNV-1a hash.
+    """
+    print("\ncached hashes on long string keys")
+    print("map  size     resize before  resize after   "
+          "get before (us)  get after (us)")
+    prefix = 'tenant/eu-west/session/' * 8
+    for size in sizes:
+        keys = [prefix + str(i) for i in range(size)]
+        for label, module, old_get in (('SC', hash_map_sc, _uncached_sc_get),
+                                       ('OA', hash_map_oa, _uncached_oa_get)):
+            m = module.HashMap(size * 2, hash_function_fnv1a)
+            for key in keys:
+                m.put(key, None)
+
+            new_capacity = m.get_capacity() * 2
+            before = _timed(_rehash_resize, m, new_capacity)
+            m.resize_table(m.get_capacity() // 2)
+            after = _timed(m.resize_table, new_capacity)
+
+            def run(get):
+                for key in keys:
+                    get(key)
+
+            get_before = _timed(run, lambda key: old_get(m, key)) / size
+            get_after = _timed(run, m.get) / size
+            print(f"{label:<4} {_format_size(size):<8} "
+                  f"{before * 1e3:>10.1f} ms  {after * 1e3:>9.1f} ms   "
+                  f"{get_before * 1e6:>15.2f}  {get_after * 1e6:>14.2f}")
+
+
+# ------------------- OA STORAGE MEMORY ---------------------------------- #
+
+def _traced_bytes(build) -> tuple:
+    """
+    Returns the number of bytes still allocated by build() once it returns,
+    along with its result.
+    """
+    gc.collect()
+    tracemalloc.start()
+    result = build()
+    allocated = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    return allocated, result
+
+
+def bench_oa_memory(sizes=(100000, 1000000)) -> None:
+    """
+    Reports bytes per entry held by the OA table itself (keys and values
+    are created beforehand and not counted) with HashEntry slots and with
+    the compact parallel-array storage.
+    """
+    print("\nOA table memory per entry (keys and values not counted)")
+    print("storage    size     capacity   bytes/entry")
+    for size in sizes:
+        keys = ['key' + str(i) for i in range(size)]
+        for compact in (False, True):
+
+            def build():
+                m = hash_map_oa.HashMap(size * 2, hash_function_builtin,
+                                        compact=compact)
+                for key in keys:
+                    m.put(key, key)
+                return m
+
+            allocated, m = _traced_bytes(build)
+            capacity = m.get_capacity()
+            label = 'compact' if compact else 'HashEntry'
+            print(f"{label:<10} {_format_size(size):<8} {capacity:>9}   "
+                  f"{allocated / size:>11.1f}")
+
+
+# ------------------- BATCH OPERATIONS ------------------------------------ #
+
+def bench_batch(sizes=(100000, 1000000)) -> None:
+    """
+    Compares put_many/get_many/remove_many against calling put/get/remove
+    once per key, starting from an empty map of the default capacity.
+    """
+    print("\nbatch operations vs per-item loop (ms)")
+    print("map  size     op       loop      batch    speedup")
+    for size in sizes:
+        keys = DynamicArray()
+        pairs = DynamicArray()
+        for i in range(size):
+            keys.append('key' + str(i))
+            pairs.append(('key' + str(i), i))
+
+        for label, module in (('SC', hash_map_sc), ('OA', hash_map_oa)):
+            looped = module.HashMap(11, hash_function_builtin)
+            batched = module.HashMap(11, hash_function_builtin)
+
+            def put_loop():
+                for index in range(pairs.length()):
+                    looped.put(pairs[index][0], pairs[index][1])
+
+            def get_loop():
+                values = DynamicArray()
+                for index in range(keys.length()):
+                    values.append(looped.get(keys[index]))
+
+            def remove_loop():
+                for index in range(keys.length()):
+                    looped.remove(keys[index])
+
+            for op, loop, batch, batch_arg in (
+                    ('put', put_loop, batched.put_many, pairs),
+                    ('get', get_loop, batched.get_many, keys),
+                    ('remove', remove_loop, batched.remove_many, keys)):
+                before = _timed(loop)
+                after = _timed(batch, batch_arg)
+                print(f"{label:<4} {_format_size(size):<8} {op:<7} "
+                      f"{before * 1e3:>7.0f}  {after * 1e3:>9.0f}   "
+                      f"{before / after:>6.2f}x")
+
+
+# ------------------- PRIME SELECTION ------------------------------------- #
+
+def _trial_division_next_prime(capacity: int) -> int:
+    """
+    next_prime as done before the growth table and Miller-Rabin: trial
+    division by every odd factor of every odd candidate.
+    """
+    def is_prime(candidate):
+        if candidate == 2 or candidate == 3:
+            return True
+        if candidate == 1 or candidate % 2 == 0:
+            return False
+        factor = 3
+        while factor ** 2 <= candidate:
+            if candidate % factor == 0:
+                return False
+            factor += 2
+        return True
+
+    if capacity % 2 == 0:
+        capacity += 1
+    while not is_prime(capacity):
+        capacity += 2
+    return capacity
+
+
+def bench_primes(sizes=(1000, 100000, 10000000, 1000000000)) -> None:
+    """
+    Times the prime search for a doubled growth-sequence capacity and for
+    an arbitrary capacity, with trial division and with next_prime, and
+    the construction of an OA HashMap followed by a resize to double.
+    """
+    print("\nprime capacity selection (microseconds)")
+    print("capacity      kind        trial division   next_prime")
+    for size in sizes:
+        # The largest growth prime below size, doubled as put would
+        doubled = 2 * GROWTH_PRIMES[bisect_left(GROWTH_PRIMES, size) - 1]
+        for kind, capacity in (('growth', doubled), ('arbitrary', size)):
+            repeat = 5
+            old = _timed(lambda: [_trial_division_next_prime(capacity)
+                                  for _ in range(repeat)]) / repeat
+            new = _timed(lambda: [next_prime(capacity)
+                                  for _ in range(repeat)]) / repeat
+            print(f"{capacity:<13} {kind:<11} {old * 1e6:>14.1f}   "
+                  f"{new * 1e6:>10.1f}")
+
+    print("\nOA construction + resize_table(2 * capacity) (ms)")
+    print("capacity      construct   resize")
+    for size in sizes[:3]:
+        construct = _timed(hash_map_oa.HashMap, size, hash_function_builtin)
+        m = hash_map_oa.HashMap(size, hash_function_builtin)
+        resize = _timed(m.resize_table, 2 * m.get_capacity())
+        print(f"{size:<13} {construct * 1e3:>9.1f}   {resize * 1e3:>6.1f}")
+
+
+# ------------------- SCRATCH MAP CLEAR ----------------------------------- #
+
+def bench_clear(sizes=(11, 1000, 100000)) -> None:
+    """
+    Times a scratch-map cycle (put a few keys, then empty the map) at each
+    capacity, emptying by building a new map of the same capacity, as
+    clear used to, and by clear, which now resets the table in place.
+    """
+    keys = ['key' + str(i) for i in range(8)]
+    print("\nscratch map: put 8 keys then empty (microseconds per cycle)")
+    print("map  capacity   rebuild     clear")
+    for size in sizes:
+        rounds = max(10, 100000 // size)
+        for label, module in (('SC', hash_map_sc), ('OA', hash_map_oa)):
+            m = module.HashMap(size, hash_function_builtin)
+
+            def rebuild_cycles():
+                scratch = m
+                for _ in range(rounds):
+                    for key in keys:
+                        scratch.put(key, 1)
+                    scratch = module.HashMap(size, hash_function_builtin)
+
+            def clear_cycles():
+                for _ in range(rounds):
+                    for key in keys:
+                        m.put(key, 1)
+                    m.clear()
+
+            before = _timed(rebuild_cycles) / rounds
+            after = _timed(clear_cycles) / rounds
+            print(f"{label:<4} {size:<10} {before * 1e6:>7.1f}  "
+                  f"{after * 1e6:>8.1f}")
+
+
+# ------------------- SC SPARSE MEMORY ------------------------------------ #
+
+def bench_sc_memory(sizes=(100000, 1000000), keys_stored=1000) -> None:
+    """
+    Reports the bytes held by SC maps of large capacity storing only a
+    few keys, with a LinkedList allocated for every bucket up front, as
+    construction used to, and with buckets that become chains on first
+    insertion; then again once every key has been removed.
+    """
+    keys = ['key' + str(i) for i in range(keys_stored)]
+    print(f"\nSC table memory with {keys_stored} keys stored (KiB)")
+    print("capacity    buckets   filled    emptied")
+    for size in sizes:
+        for eager in (True, False):
+
+            gc.collect()
+            tracemalloc.start()
+            m = hash_map_sc.HashMap(size, hash_function_builtin)
+            if eager:
+                for index in range(m.get_capacity()):
+                    m._buckets[index] = LinkedList()
+            for key in keys:
+                m.put(key, key)
+            filled = tracemalloc.get_traced_memory()[0]
+            for key in keys:
+                m.remove(key)
+            emptied = tracemalloc.get_traced_memory()[0]
+            tracemalloc.stop()
+
+            label = 'eager' if eager else 'lazy'
+            print(f"{size:<11} {label:<8} {filled / 1024:>7.0f}  "
+                  f"{emptied / 1024:>9.0f}")
+
+
+# ------------------- PROBE LENGTHS --------------------------------------- #
+
+class _CountingSlots:
+    """
+    Wraps a table of slots and counts how many of them are read.
+    """
+
+    def __init__(self, buckets) -> None:
+        self.buckets = buckets
+        self.reads = 0
+
+    def __getitem__(self, index: int):
+        self.reads += 1
+        return self.buckets[index]
+
+
+def _probe_lengths(m: hash_map_oa.HashMap, keys: list) -> list:
+    """
+    Returns the number of slots read by a lookup of each of the keys.
+    """
+    lengths = []
+    for key in keys:
+        slots = _CountingSlots(m._buckets)
+        m._find_index(key, m._hash_function(key) & HASH_MASK, slots,
+                      m.get_capacity())
+        lengths.append(slots.reads)
+    return lengths
+
+
+def bench_probe_lengths(sizes=(100000,),
+                        loads=(0.25, 0.45, 0.6, 0.75, 0.85)) -> None:
+    """
+    Fills OA maps with quadratic and Robin Hood probing to each load
+    factor (quadratic only below its 0.5 maximum) and reports the mean and
+    max probe length of lookups of stored keys, and the mean for missing
+    keys, along with the time per get.
+    """
+    print("\nOA probe lengths (slots read per lookup)")
+    print("probing     size     load   hit mean  hit max   miss mean  "
+          "get (us)")
+    for size in sizes:
+        keys = ['key' + str(i) for i in range(size)]
+        missing = ['missing' + str(i) for i in range(size)]
+        for probing in ('quadratic', 'robin_hood'):
+            for load in loads:
+                if load >= hash_map_oa.HashMap._MAX_LOAD[probing]:
+                    continue
+                m = hash_map_oa.HashMap(int(size / load),
+                                        hash_function_builtin,
+                                        probing=probing)
+                for key in keys:
+                    m.put(key, key)
+                hits = _probe_lengths(m, keys)
+                misses = _probe_lengths(m, missing)
+                elapsed = _timed(lambda: [m.get(key) for key in keys])
+                print(f"{probing:<11} {_format_size(size):<8} "
+                      f"{m.table_load():<6.2f} {sum(hits) / size:>8.2f}  "
+                      f"{max(hits):>7}   {sum(misses) / size:>9.2f}  "
+                      f"{elapsed / size * 1e6:>8.2f}")
+
+
+def bench_probing(sizes=(5000, 50000)) -> None:
+    """
+    Runs every OA probing strategy on the same keys, with hash values that
+    spread evenly (hash_function_builtin) and that cluster on a narrow
+    range (hash_function_1, which sums character codes), and reports put
+    and get throughput and the average probe length of hits and misses.
+    The clustered dataset uses a tenth of the keys, as linear probing
+    degrades to a scan of the cluster on it.
+    """
+    print("\nOA probing strategies (throughput in thousands of ops/s)")
+    print("hash       size     probing      put k/s   get k/s  "
+          "hit probes  miss probes")
+    for label, function, divisor in (('builtin', hash_function_builtin, 1),
+                                     ('function1', hash_function_1, 10)):
+        for size in sizes:
+            count = size // divisor
+            keys = ['key' + str(i) for i in range(count)]
+            missing = ['missing' + str(i) for i in range(count)]
+            for probing in ('linear', 'quadratic', 'double', 'robin_hood'):
+                m = hash_map_oa.HashMap(11, function, probing=probing)
+
+                def put_all():
+                    for key in keys:
+                        m.put(key, key)
+
+                put_time = _timed(put_all)
+                get_time = _timed(lambda: [m.get(key) for key in keys])
+                hits = _probe_lengths(m, keys)
+                misses = _probe_lengths(m, missing)
+                print(f"{label:<10} {_format_size(count):<8} {probing:<11} "
+                      f"{count / put_time / 1e3:>8.0f}  "
+                      f"{count / get_time / 1e3:>8.0f}  "
+                      f"{sum(hits) / count:>10.2f}  "
+                      f"{sum(misses) / count:>11.2f}")
+
+
+# ------------------- CONCURRENT THROUGHPUT ------------------------------- #
+
+class _GlobalLockMap:
+    """
+    SC HashMap with every call made under one lock, as callers had to share
+    a map between threads before ConcurrentHashMap.
+    """
+
+    def __init__(self) -> None:
+        self.map = hash_map_sc.HashMap(11, hash_function_builtin)
+        self.lock = threading.Lock()
+
+    def put(self, key: str, value: object) -> None:
+        with self.lock:
+            self.map.put(key, value)
+
+    def get(self, key: str) -> object:
+        with self.lock:
+            return self.map.get(key)
+
+
+def bench_concurrent(sizes=(200000,), thread_counts=(1, 2, 4, 8)) -> None:
+    """
+    Splits the same mix of puts and gets (one put per three gets) between
+    1, 2, 4 and 8 threads, on an SC map behind one global lock and on a
+    ConcurrentHashMap, and reports the total throughput. With the GIL only
+    one thread runs Python code at a time, so this mostly shows the cost
+    of the locking; the stripes pay off on a free-threaded build.
+    """
+    print("\nshared map throughput (thousands of ops/s)")
+    print("ops      threads  global lock  striped")
+    for size in sizes:
+        for threads_count in thread_counts:
+            per_thread = size // threads_count
+            keys = [['t' + str(number) + '-' + str(i)
+                     for i in range(per_thread // 4)]
+                    for number in range(threads_count)]
+            results = []
+            for m in (_GlobalLockMap(),
+                      hash_map_concurrent.ConcurrentHashMap(
+                          11, hash_function_builtin)):
+
+                def work(own_keys):
+                    for key in own_keys:
+                        m.put(key, key)
+                        m.get(key)
+                        m.get(key)
+                        m.get(key)
+
+                workers = [threading.Thread(target=work, args=(own,))
+                           for own in keys]
+
+                def run():
+                    for thread in workers:
+                        thread.start()
+                    for thread in workers:
+                        thread.join()
+
+                results.append(size / _timed(run) / 1e3)
+            print(f"{_format_size(size):<8} {threads_count:<8} "
+                  f"{results[0]:>11.0f}  {results[1]:>7.0f}")
+
+
+# ------------------- SHARDED FIND_MODE ----------------------------------- #
+
+def bench_sharded(sizes=(1000000,), shard_counts=(1, 2, 4)) -> None:
+    """
+    Times find_mode on one SC map against the sharded find_mode with 1, 2
+    and 4 worker processes, over values drawn from a thousand distinct
+    strings. The sharded times include starting the workers; they only beat
+    the single map with a core per worker to spare.
+    """
+    print("\nfind_mode (seconds)")
+    print("values   single map  " +
+          "  ".join(f"{count} shard(s)" for count in shard_counts))
+    for size in sizes:
+        da = DynamicArray(['v' + str((i * 7919) % 1000)
+                           for i in range(size)])
+        single = _timed(hash_map_sc.find_mode, da)
+        sharded = [_timed(hash_map_sharded.find_mode, da, count)
+                   for count in shard_counts]
+        print(f"{_format_size(size):<8} {single:>10.2f}  " +
+              "  ".join(f"{elapsed:>10.2f}" for elapsed in sharded))
+
+
+# ------------------- FIND_MODE ------------------------------------------- #
+
+def _three_lookup_find_mode(da: DynamicArray) -> tuple:
+    """
+    find_mode as it was before HashMap.increment: contains_key, get and put
+    for every value, then one pass over the counts for the highest count and
+    another for the values that have it.
+    """
+    map = hash_map_sc.HashMap()
+    for index in range(da.length()):
+        if map.contains_key(da[index]) is False:
+            map.put(da[index], 1)
+        else:
+            map.put(da[index], map.get(da[index]) + 1)
+
+    frequency = 0
+    frequency_list = map.get_keys_and_values()
+    for index in range(frequency_list.length()):
+        if frequency < frequency_list[index][1]:
+            frequency = frequency_list[index][1]
+    mode_list = DynamicArray()
+    for index in range(frequency_list.length()):
+        if frequency_list[index][1] == frequency:
+            mode_list.append(frequency_list[index][0])
+    return mode_list, frequency
+
+
+def bench_find_mode(sizes=(10000000,), process_counts=(2, 4),
+                    distinct=(100, 1000)) -> None:
+    """
+    Times the old three-lookup find_mode against find_mode counting with
+    increment in one process and in a pool of 2 and 4 processes, on values
+    drawn from a hundred and from a thousand distinct strings (find_mode
+    hashes with hash_function_1, whose chains grow too long to time with
+    many more). The pool only wins with a core per process to spare.
+    """
+    print("\nfind_mode (seconds)")
+    print("values   distinct  3 lookups  increment  " +
+          "  ".join(f"{count} processes" for count in process_counts))
+    for size in sizes:
+        for count in distinct:
+            da = DynamicArray(['v' + str((i * 7919) % count)
+                               for i in range(size)])
+            old = _timed(_three_lookup_find_mode, da)
+            single = _timed(hash_map_sc.find_mode, da)
+            pooled = [_timed(hash_map_sc.find_mode, da, processes)
+                      for processes in process_counts]
+            print(f"{_format_size(size):<8} {_format_size(count):<9} "
+                  f"{old:>9.2f}  {single:>9.2f}  " +
+                  "  ".join(f"{elapsed:>11.2f}" for elapsed in pooled))
+
+
+# ------------------- ITERATION ------------------------------------------- #
+
+def _peak_bytes(run) -> int:
+    """
+    Returns the highest number of bytes allocated at once while run() runs,
+    beyond what was allocated before it started.
+    """
+    gc.collect()
+    tracemalloc.start()
+    run()
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    return peak
+
+
+def bench_iterate(sizes=(10000000,)) -> None:
+    """
+    Visits every pair of an SC and an OA map once by copying them out with
+    get_keys_and_values and once with the items() iterator, and reports the
+    time taken and the peak memory allocated on the way.
+    """
+    print("\niterating over every pair")
+    print("map  size     method               seconds  peak memory")
+    for size in sizes:
+        keys = ['key' + str(i) for i in range(size)]
+        # Build one map at a time, so only one is in memory at once
+        for label, make in (
+                ('SC', lambda: hash_map_sc.HashMap(size,
+                                                   hash_function_builtin)),
+                ('OA', lambda: hash_map_oa.HashMap(size * 2,
+                                                   hash_function_builtin))):
+            m = make()
+            for key in keys:
+                m.put(key, key)
+
+            def copy():
+                pairs = m.get_keys_and_values()
+                for index in range(pairs.length()):
+                    pairs[index]
+
+            def stream():
+                for pair in m.items():
+                    pass
+
+            for method, run in (('get_keys_and_values', copy),
+                                ('items()', stream)):
+                elapsed = _timed(run)
+                peak = _peak_bytes(run)
+                print(f"{label:<4} {_format_size(size):<8} {method:<20} "
+                      f"{elapsed:>7.2f}  {peak / 2 ** 20:>8.1f} MB")
+            del m
+
+
+# ------------------- TREE BUCKETS ---------------------------------------- #
+
+def bench_treeify(sizes=(10000, 50000)) -> None:
+    """
+    Fills an SC map with anagram keys under hash_function_1, which puts
+    them all in a few dozen buckets, and times putting and then getting
+    every key with long buckets turned into trees and with plain chains.
+    """
+    print("\nput and get of anagram keys under hash_function_1")
+    print("size     buckets   put seconds  get seconds  longest bucket")
+    for size in sizes:
+        keys = anagram_keys(size)
+        for label, threshold in (('chains', size), ('trees', None)):
+            m = hash_map_sc.HashMap(11, hash_function_1)
+            if threshold is not None:
+                # Never reached, so every bucket stays a chain
+                m._TREEIFY_THRESHOLD = threshold
+
+            def put_all():
+                for key in keys:
+                    m.put(key, None)
+
+            def get_all():
+                for key in keys:
+                    m.get(key)
+
+            put_seconds = _timed(put_all)
+            get_seconds = _timed(get_all)
+            longest = max(m._buckets[index].length()
+                          for index in range(m.get_capacity()))
+            print(f"{_format_size(size):<8} {label:<8} {put_seconds:>12.2f} "
+                  f"{get_seconds:>12.2f}  {longest:>14}")
+
+
+# ------------------- MOVE TO FRONT --------------------------------------- #
+
+def bench_move_to_front(sizes=(10000, 100000), skews=(0.8, 1.0, 1.2)) -> None:
+    """
+    Times getting a Zipfian stream of keys (ten lookups per stored key) from
+    an SC map, with and without move_to_front, for each skew. Chains stay
+    short at the SC load factor, so the difference shows how much of a get
+    the chain walk is; hash_function_2 is used for its longer chains.
+    """
+    print("\ngets of Zipfian keys from an SC map")
+    print("size     skew   plain seconds  move_to_front seconds")
+    for size in sizes:
+        for skew in skews:
+            keys, stream = zipfian_keys(size, random.Random(1), skew)
+            stream *= 10
+            results = []
+            for move_to_front in (False, True):
+                m = hash_map_sc.HashMap(11, hash_function_2,
+                                        move_to_front=move_to_front)
+                for key in keys:
+                    m.put(key, key)
+
+                def get_all():
+                    for key in stream:
+                        m.get(key)
+
+                results.append(_timed(get_all))
+            print(f"{_format_size(size):<8} {skew:<6} {results[0]:>13.2f}  "
+                  f"{results[1]:>21.2f}")
+
+
+# ------------------- ENTRY POINT ----------------------------------------- #
+
+BENCHMARKS = {
+    'oa_lookup': bench_oa_lookup,
+    'put_latency': bench_put_latency,
+    'hash_functions': bench_hash_functions,
+    'cached_hash': bench_cached_hash,
+    'oa_memory': bench_oa_memory,
+    'batch': bench_batch,
+    'primes': bench_primes,
+    'clear': bench_clear,
+    'sc_memory': bench_sc_memory,
+    'probe_lengths': bench_probe_lengths,
+    'probing': bench_probing,
+    'concurrent': bench_concurrent,
+    'sharded': bench_sharded,
+    'find_mode': bench_find_mode,
+    'iterate': bench_iterate,
+    'treeify': bench_treeify,
+    'move_to_front': bench_move_to_front,
+}
+
+if __name__ == "__main__":
+
+    names = sys.argv[1:2] or list(BENCHMARKS)
+    sizes = tuple(int(arg) for arg in sys.argv[2:])
+    for name in names:
+        if sizes:
+            BENCHMARKS[name](sizes)
+        else:
+            BENCHMARKS[name]()
@@ -0,0 +1,65 @@
+# Description: Key generators and statistics shared by benchmark.py and
+#              benchmark_suite.py.
+
+import random
+
+
+def percentile(samples: list, fraction: float) -> float:
+    """
+    Returns the value at the given fraction (0.0 - 1.0) of the sorted
+    samples.
+    """
+    ordered = sorted(samples)
+    return ordered[min(len(ordered) - 1, int(fraction * len(ordered)))]
+
+
+def anagram_keys(size: int) -> list:
+    """
+    Returns size distinct keys made of a handful of digit strings and all
+    of their rotations, the worst case for a character-sum hash.
+    """
+    keys = []
+    base = 100000
+    while len(keys) < size:
+        digits = str(base)
+        for shift in range(len(digits)):
+            keys.append('id' + digits[shift:] + digits[:shift])
+        base += 1
+    return keys[:size]
+
+
+def uniform_keys(size: int, rnd: random.Random) -> tuple:
+    """
+    Returns size distinct keys and a stream of size keys drawn from them
+    with equal probability.
+    """
+    keys = ['key' + str(i) for i in range(size)]
+    return keys, rnd.choices(keys, k=size)
+
+
+def zipfian_keys(size: int, rnd: random.Random, skew: float = 1.0) -> tuple:
+    """
+    Returns size distinct keys and a stream of size keys drawn from them
+    with Zipf's law: the key of rank r turns up in proportion to 1 / r^skew,
+    so a few keys make up most of the stream.
+    """
+    keys = ['key' + str(i) for i in range(size)]
+    rnd.shuffle(keys)
+    weights = []
+    total = 0.0
+    for rank in range(1, size + 1):
+        total += 1.0 / rank ** skew
+        weights.append(total)
+    return keys, rnd.choices(keys, cum_weights=weights, k=size)
+
+
+def adversarial_keys(size: int, rnd: random.Random) -> tuple:
+    """
+    Returns size distinct keys built from the rotations of a few digit
+    strings, which collide under character-sum hashing, and the same keys
+    in random order as the stream.
+    """
+    keys = anagram_keys(size)
+    stream = list(keys)
+    rnd.shuffle(stream)
+    return keys, stream
@@ -0,0 +1,288 @@
+# Description: Benchmark suite driving the SC and OA HashMaps through fixed
+#              workloads, key distributions, sizes and hash functions, and
+#              writing the results as JSON so that runs can be compared.
+#              Run as `python benchmark_suite.py [sizes...] > run.json`, then
+#              `python benchmark_suite.py --compare old.json new.json`.
+
+from functools import partial
+import gc
+import json
+import platform
+import random
+import sys
+import time
+import tracemalloc
+
+from a6_include import (DynamicArray, hash_function_2, hash_function_builtin,
+                        hash_function_fnv1a)
+from benchmark_keys import (adversarial_keys, percentile, uniform_keys,
+                           zipfian_keys)
+import hash_map_oa
+import hash_map_sc
+
+
+MAPS = {
+    'SC': hash_map_sc.HashMap,
+    'SC-MTF': partial(hash_map_sc.HashMap, move_to_front=True),
+    'OA': hash_map_oa.HashMap,
+}
+
+# hash_function_1 is left out: on the adversarial keys it puts every key in
+# a few dozen buckets, and the suite would spend its time on that alone
+HASH_FUNCTIONS = {
+    'hash_function_2': hash_function_2,
+    'hash_function_fnv1a': hash_function_fnv1a,
+    'hash_function_builtin': hash_function_builtin,
+}
+
+
+# ------------------- KEY DISTRIBUTIONS ----------------------------------- #
+
+DISTRIBUTIONS = {
+    'uniform': uniform_keys,
+    'zipfian': zipfian_keys,
+    'adversarial': adversarial_keys,
+}
+
+
+# ------------------- WORKLOADS ------------------------------------------- #
+# Each workload builds its map (untimed) and returns it with the list of
+# (function, arguments) operations whose time is measured one at a time
+
+def _loaded(make: callable, keys: list):
+    """
+    Returns a new map holding every one of the given keys.
+    """
+    m = make()
+    for key in keys:
+        m.put(key, key)
+    return m
+
+
+def put_workload(make: callable, keys: list, stream: list) -> tuple:
+    """
+    Puts every key of the stream into a map that starts at its default
+    capacity, so the growth resizes are part of the timing.
+    """
+    m = make()
+    return m, [(m.put, (key, key)) for key in stream]
+
+
+def get_workload(make: callable, keys: list, stream: list) -> tuple:
+    """
+    Looks up every key of the stream in a map holding all the keys.
+    """
+    m = _loaded(make, keys)
+    return m, [(m.get, (key,)) for key in stream]
+
+
+def remove_workload(make: callable, keys: list, stream: list) -> tuple:
+    """
+    Removes the keys of the stream from a map holding all the keys; repeated
+    keys are already gone the second time.
+    """
+    m = _loaded(make, keys)
+    return m, [(m.remove, (key,)) for key in stream]
+
+
+def churn_workload(make: callable, keys: list, stream: list) -> tuple:
+    """
+    Keeps about half the keys in the map: every key of the stream is put
+    under a new name, and the name put half the stream earlier is removed,
+    so the map keeps filling its tombstones or freed chains.
+    """
+    m = make()
+    window = max(1, len(stream) // 2)
+    names = [key + '#' + str(i) for i, key in enumerate(stream)]
+    operations = []
+    for i, name in enumerate(names):
+        operations.append((m.put, (name, i)))
+        if i >= window:
+            operations.append((m.remove, (names[i - window],)))
+    return m, operations
+
+
+def resize_workload(make: callable, keys: list, stream: list) -> tuple:
+    """
+    Resizes a map holding all the keys to 2, 4 and 8 times its size and back
+    down.
+    """
+    m = _loaded(make, keys)
+    capacities = [len(keys) * factor for factor in (2, 4, 8, 4, 2, 1)]
+    return m, [(m.resize_table, (capacity,)) for capacity in capacities]
+
+
+def _visit(m) -> None:
+    """
+    Goes through every (key, value) pair of the map once.
+    """
+    for pair in m.items():
+        pass
+
+
+def iterate_workload(make: callable, keys: list, stream: list) -> tuple:
+    """
+    Iterates over every pair of a map holding all the keys, ten times.
+    """
+    m = _loaded(make, keys)
+    return m, [(_visit, (m,)) for _ in range(10)]
+
+
+def find_mode_workload(make: callable, keys: list, stream: list) -> tuple:
+    """
+    Runs find_mode of the SC module once over the stream. find_mode builds
+    its own maps with the default hash_function_1, so this workload only
+    runs once per size and distribution, and its result is labelled with
+    that function.
+    """
+    da = DynamicArray(stream)
+    return None, [(hash_map_sc.find_mode, (da,))]
+
+
+WORKLOADS = {
+    'put': put_workload,
+    'get': get_workload,
+    'remove': remove_workload,
+    'churn': churn_workload,
+    'resize': resize_workload,
+    'iterate': iterate_workload,
+    'find_mode': find_mode_workload,
+}
+
+
+# ------------------- RUNNER ---------------------------------------------- #
+
+def _measure(workload: callable, make: callable, keys: list,
+             stream: list) -> dict:
+    """
+    Runs the workload twice: once timing each operation, with the garbage
+    collector off so its pauses do not land on random operations, and once
+    under tracemalloc for the peak memory allocated from the start of the
+    workload's setup, which is too slow to time.
+
+    :return: dict of the measurements
+    """
+    m, operations = workload(make, keys, stream)
+    latencies = []
+    clock = time.perf_counter
+    gc.collect()
+    gc.disable()
+    for function, arguments in operations:
+        start = clock()
+        function(*arguments)
+        latencies.append(clock() - start)
+    gc.enable()
+    del m, operations
+
+    gc.collect()
+    tracemalloc.start()
+    m, operations = workload(make, keys, stream)
+    for function, arguments in operations:
+        function(*arguments)
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+
+    seconds = sum(latencies)
+    return {
+        'operations': len(latencies),
+        'seconds': seconds,
+        'ops_per_sec': len(latencies) / seconds if seconds else None,
+        'latency_us': {
+            'p50': percentile(latencies, 0.5) * 1e6,
+            'p90': percentile(latencies, 0.9) * 1e6,
+            'p99': percentile(latencies, 0.99) * 1e6,
+            'max': max(latencies) * 1e6,
+        },
+        'peak_memory_bytes': peak,
+    }
+
+
+def run_suite(sizes=(1000, 10000), seed: int = 1) -> dict:
+    """
+    Runs every workload for every map, hash function, key distribution and
+    size, with keys drawn from a generator seeded with seed so that every
+    run sees the same keys.
+
+    :return: dict holding the environment and a list of results, ready to be
+    written as JSON
+    """
+    results = []
+    for size in sizes:
+        for distribution, generate in DISTRIBUTIONS.items():
+            keys, stream = generate(size, random.Random(seed))
+            for map_name, map_class in MAPS.items():
+                for function_name, function in HASH_FUNCTIONS.items():
+                    print(f"{size} {distribution} {map_name} "
+                          f"{function_name}", file=sys.stderr)
+
+                    def make():
+                        return map_class(11, function)
+
+                    for workload_name, workload in WORKLOADS.items():
+                        if workload is find_mode_workload and (
+                                map_name != 'SC' or
+                                function is not hash_function_2):
+                            continue
+                        result = {
+                            'map': map_name,
+                            'hash_function': (
+                                'hash_function_1'
+                                if workload is find_mode_workload
+                                else function_name),
+                            'distribution': distribution,
+                            'workload': workload_name,
+                            'size': size,
+                        }
+                        result.update(_measure(workload, make, keys, stream))
+                        results.append(result)
+
+    return {
+        'python': sys.version,
+        'platform': platform.platform(),
+        'started': time.strftime('%Y-%m-%dT%H:%M:%S'),
+        'seed': seed,
+        'results': results,
+    }
+
+
+def compare(old_path: str, new_path: str) -> None:
+    """
+    Prints the change in throughput, p99 latency and peak memory of every
+    result found in both JSON files.
+
+    :param old_path: path of the earlier run
+    :param new_path: path of the later run
+    """
+    def load(path):
+        with open(path) as file:
+            results = json.load(file)['results']
+        return {(r['map'], r['hash_function'], r['distribution'],
+                 r['workload'], r['size']): r for r in results}
+
+    old = load(old_path)
+    new = load(new_path)
+    print("map  hash function           distribution  workload   size      "
+          "ops/s     p99   memory")
+    for key in old:
+        if key not in new:
+            continue
+        before, after = old[key], new[key]
+        throughput = after['ops_per_sec'] / before['ops_per_sec']
+        p99 = after['latency_us']['p99'] / before['latency_us']['p99']
+        memory = (after['peak_memory_bytes'] + 1) / \
+            (before['peak_memory_bytes'] + 1)
+        print(f"{key[0]:<4} {key[1]:<23} {key[2]:<13} {key[3]:<10} "
+              f"{key[4]:<8} {throughput:>6.2f}x {p99:>6.2f}x {memory:>7.2f}x")
+
+
+# ------------------- ENTRY POINT ----------------------------------------- #
+
+if __name__ == "__main__":
+
+    if sys.argv[1:2] == ['--compare']:
+        compare(sys.argv[2], sys.argv[3])
+    else:
+        sizes = tuple(int(arg) for arg in sys.argv[1:])
+        report = run_suite(sizes) if sizes else run_suite()
+        json.dump(report, sys.stdout, indent=2)
+        print()
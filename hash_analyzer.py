@@ -0,0 +1,223 @@
+# Description: Measures how well a hash function spreads a sample of keys
+#              over the bucket counts a HashMap would use for them, and how
+#              much its output changes when one bit of a key changes.
+#              Run as `python hash_analyzer.py [keys_file] [module.function
+#              ...]`; with no arguments the a6_include hash functions are
+#              compared on built-in key samples.
+
+import importlib
+import random
+import sys
+
+from a6_include import (HASH_MASK, hash_function_1, hash_function_2,
+                        hash_function_builtin, hash_function_fnv1a,
+                        next_prime)
+
+
+# Bits of hash output compared by the avalanche test; every HashMap masks
+# hashes to HASH_MASK before use
+_HASH_BITS = 64
+
+
+class DistributionReport:
+    """
+    How the keys of a sample fall into the buckets of one table capacity:
+
+    collision_rate is the fraction of keys that land in a bucket some
+    earlier key already took (for a uniform hash with as many buckets as
+    keys, about 0.37); max_chain the most keys in one bucket; chi_squared
+    the chi-squared statistic of the bucket counts against a uniform
+    spread, and chi_squared_ratio that statistic over its degrees of
+    freedom, which stays near 1.0 for a uniform hash and grows with bias.
+    """
+    __slots__ = ('capacity', 'keys', 'collision_rate', 'max_chain',
+                 'chi_squared', 'chi_squared_ratio')
+
+    def __init__(self, capacity: int, keys: int) -> None:
+        """Initialize an empty report for the given capacity and keys."""
+        self.capacity = capacity
+        self.keys = keys
+        self.collision_rate = 0.0
+        self.max_chain = 0
+        self.chi_squared = 0.0
+        self.chi_squared_ratio = 0.0
+
+    def __str__(self) -> str:
+        """Override string method to provide more readable output."""
+        return (f"capacity: {self.capacity} load: "
+                f"{self.keys / self.capacity:.2f} collision rate: "
+                f"{self.collision_rate:.3f} max chain: {self.max_chain} "
+                f"chi-squared/dof: {self.chi_squared_ratio:.2f}")
+
+
+def capacities_for(count: int, start: int = 11) -> list:
+    """
+    Returns the capacities a HashMap created with the given capacity passes
+    through while count keys are put into it: start rounded up by
+    next_prime, then next_prime of each doubling, up to the first capacity
+    that keeps the load factor of count keys below 0.5.
+
+    :param count: int representing the number of keys
+    :param start: int representing the capacity given to the constructor
+
+    :return: list of prime capacities
+    """
+    capacity = next_prime(start)
+    capacities = [capacity]
+    while count >= capacity * 0.5:
+        capacity = next_prime(capacity * 2)
+        capacities.append(capacity)
+    return capacities
+
+
+def bucket_distribution(function: callable, keys: list,
+                        capacity: int) -> DistributionReport:
+    """
+    Places every key in the bucket a HashMap of the given capacity would
+    use and measures how evenly they are spread.
+
+    :param function: hash function taking a key and returning an int
+    :param keys: list of distinct keys
+    :param capacity: int representing the number of buckets
+
+    :return: DistributionReport of the sample at this capacity
+    """
+    counts = [0] * capacity
+    collisions = 0
+    for key in keys:
+        index = (function(key) & HASH_MASK) % capacity
+        if counts[index] > 0:
+            collisions += 1
+        counts[index] += 1
+
+    report = DistributionReport(capacity, len(keys))
+    if not keys:
+        return report
+    expected = len(keys) / capacity
+    report.collision_rate = collisions / len(keys)
+    report.max_chain = max(counts)
+    report.chi_squared = sum((count - expected) ** 2
+                             for count in counts) / expected
+    report.chi_squared_ratio = report.chi_squared / max(1, capacity - 1)
+    return report
+
+
+def avalanche(function: callable, keys: list) -> tuple:
+    """
+    Flips each of the low 7 bits of every character of every key, one at a
+    time, and counts how many of the 64 hash bits change. A hash with good
+    avalanche behavior changes each output bit with probability 0.5, so
+    half of them on average, whichever input bit was flipped.
+
+    :param function: hash function taking a key and returning an int
+    :param keys: list of keys
+
+    :return: tuple of the mean fraction of output bits changed, and the
+    largest distance of any one output bit's change rate from 0.5
+    """
+    flips = 0
+    changed_bits = 0
+    bit_changes = [0] * _HASH_BITS
+    for key in keys:
+        original = function(key) & HASH_MASK
+        for position in range(len(key)):
+            for bit in range(7):
+                flipped = (key[:position] +
+                           chr(ord(key[position]) ^ (1 << bit)) +
+                           key[position + 1:])
+                difference = original ^ (function(flipped) & HASH_MASK)
+                flips += 1
+                changed_bits += bin(difference).count('1')
+                for output_bit in range(_HASH_BITS):
+                    if difference >> output_bit & 1:
+                        bit_changes[output_bit] += 1
+
+    if flips == 0:
+        return 0.0, 0.5
+    worst_bias = max(abs(changes / flips - 0.5) for changes in bit_changes)
+    return changed_bits / (flips * _HASH_BITS), worst_bias
+
+
+def analyze(function: callable, keys: list, capacities: list = None,
+            avalanche_keys: int = 200) -> tuple:
+    """
+    Runs every measure for one hash function over one key sample.
+
+    :param function: hash function taking a key and returning an int
+    :param keys: list of distinct keys
+    :param capacities: list of capacities to place the keys at, by default
+    those of capacities_for(len(keys))
+    :param avalanche_keys: int number of keys of the sample (spread over it)
+    used for the avalanche test, which hashes each key once per input bit
+
+    :return: tuple of a list of DistributionReport, one per capacity, the
+    mean fraction of output bits changed per flipped input bit, and the
+    worst bias of any output bit
+    """
+    if capacities is None:
+        capacities = capacities_for(len(keys))
+    reports = [bucket_distribution(function, keys, capacity)
+               for capacity in capacities]
+    step = max(1, len(keys) // avalanche_keys)
+    mean, bias = avalanche(function, keys[::step][:avalanche_keys])
+    return reports, mean, bias
+
+
+def print_analysis(name: str, function: callable, keys: list) -> None:
+    """
+    Prints the measures of analyze for the given hash function: one line
+    per capacity, then the avalanche results.
+    """
+    reports, mean, bias = analyze(function, keys)
+    print(f"\n{name}")
+    print("capacity    load  collision rate  max chain  chi-squared/dof")
+    for report in reports:
+        print(f"{report.capacity:>8}  {report.keys / report.capacity:>6.2f}"
+              f"  {report.collision_rate:>14.3f}  {report.max_chain:>9}"
+              f"  {report.chi_squared_ratio:>15.2f}")
+    print(f"avalanche: {mean:.3f} of output bits change per input bit "
+          f"(ideal 0.500), worst output bit bias {bias:.3f} (ideal 0.000)")
+
+
+def _load_function(spec: str) -> callable:
+    """
+    Returns the function named by 'module.function', importing the module.
+    """
+    module_name, _, function_name = spec.rpartition('.')
+    return getattr(importlib.import_module(module_name), function_name)
+
+
+# ------------------- ENTRY POINT ----------------------------------------- #
+
+if __name__ == "__main__":
+
+    FUNCTIONS = {
+        'hash_function_1': hash_function_1,
+        'hash_function_2': hash_function_2,
+        'hash_function_fnv1a': hash_function_fnv1a,
+        'hash_function_builtin': hash_function_builtin,
+    }
+
+    if len(sys.argv) > 1:
+        with open(sys.argv[1]) as file:
+            # Distinct keys, one per line, in first-seen order
+            samples = {sys.argv[1]: list(dict.fromkeys(
+                line.rstrip('\n') for line in file if line.strip()))}
+        if len(sys.argv) > 2:
+            FUNCTIONS = {spec: _load_function(spec) for spec in sys.argv[2:]}
+    else:
+        rnd = random.Random(1)
+        samples = {
+            # Keys of the PDF examples: 'str12' and 'str21' sum the same
+            'sequential keys str0 - str9999':
+                ['str' + str(i) for i in range(10000)],
+            'random 8-letter words':
+                list(dict.fromkeys(
+                    ''.join(rnd.choices('abcdefghijklmnopqrstuvwxyz', k=8))
+                    for _ in range(10000))),
+        }
+
+    for sample, keys in samples.items():
+        print(f"\n===== {sample} ({len(keys)} keys) =====")
+        for name, function in FUNCTIONS.items():
+            print_analysis(name, function, keys)
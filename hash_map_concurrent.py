@@ -0,0 +1,517 @@
+# Description: Thread-safe HashMap built on the separate chaining HashMap,
+#              with one lock per range of buckets
+
+import threading
+
+from operator import attrgetter
+
+from a6_include import (DynamicArray, HashMapStats, LinkedList,
+                        hash_function_1)
+from hash_map_sc import _EMPTY_BUCKET, HashMap, HashMapIterator
+
+
+class ConcurrentHashMap(HashMap):
+    """
+    Separate chaining HashMap that may be shared between threads.
+
+    The buckets are split into `stripes` contiguous ranges, each guarded by
+    its own lock, so operations on keys in different ranges do not wait for
+    each other. Which range holds a bucket depends on the capacity, so the
+    stripe locks double as the reader side of a reader/writer protocol for
+    the table layout: put, get, contains_key and remove hold the lock of one
+    stripe, and anything that reads or replaces the whole table (resizing,
+    clear, get_keys_and_values, empty_buckets) is the writer and takes all
+    of them, always in the same order.
+
+    Each stripe counts its own entries, so no single counter is shared
+    between writers; get_size adds them up.
+
+    Iteration (iter, keys, values, items) walks a copy of every pair taken
+    with all stripe locks held, so it never sees the table change; nodes
+    it returns are those copies, not the nodes in the map. get_stats
+    likewise reads the table with every lock held.
+    """
+
+    def __init__(self,
+                 capacity: int = 11,
+                 function: callable = hash_function_1,
+                 stripes: int = 16,
+                 move_to_front: bool = False) -> None:
+        """
+        Initialize new ConcurrentHashMap with the given number of stripe
+        locks. move_to_front is as for HashMap; the chain is reordered
+        under its stripe lock, so get and contains_key stay safe with it.
+        """
+        super().__init__(capacity, function, move_to_front=move_to_front)
+
+        self._stripes = stripes
+        # The locks never change, so a tuple spares every operation the
+        # bounds check of DynamicArray
+        self._locks = tuple(threading.Lock() for _ in range(stripes))
+        self._stripe_sizes = DynamicArray([0] * stripes)
+
+    def get_size(self) -> int:
+        """
+        Return size of map. With writers running, the result may be out of
+        date by the time it is returned.
+        """
+        size = 0
+        for stripe in range(self._stripes):
+            size += self._stripe_sizes[stripe]
+        return size
+
+    # ------------------------------------------------------------------ #
+
+    def _lock_bucket(self, hash_value: int) -> tuple:
+        """
+        Locks the stripe holding the bucket of the given key hash.
+
+        :param hash_value: integer hash of the key
+
+        :return: tuple of the bucket index and the stripe index, whose lock
+        the caller must release
+        """
+        while True:
+            capacity = self._capacity
+            index = hash_value % capacity
+            stripe = index * self._stripes // capacity
+            lock = self._locks[stripe]
+            lock.acquire()
+            # A resize needs every stripe lock, so once this one is held the
+            # capacity can only have changed before it was acquired
+            if self._capacity == capacity:
+                return index, stripe
+            lock.release()
+
+    def _lock_all(self) -> None:
+        """
+        Acquires every stripe lock, in stripe order.
+        """
+        for stripe in range(self._stripes):
+            self._locks[stripe].acquire()
+
+    def _unlock_all(self) -> None:
+        """
+        Releases every stripe lock.
+        """
+        for stripe in range(self._stripes):
+            self._locks[stripe].release()
+
+    def _recount_stripes(self) -> None:
+        """
+        Recounts the entries of every stripe after the bucket ranges have
+        moved, and sets the total size used by the HashMap methods. Every
+        stripe lock must be held.
+        """
+        for stripe in range(self._stripes):
+            self._stripe_sizes[stripe] = 0
+        for index in range(self._capacity):
+            bucket = self._buckets[index]
+            if bucket is not _EMPTY_BUCKET:
+                stripe = index * self._stripes // self._capacity
+                self._stripe_sizes[stripe] += bucket.length()
+        self._size = self.get_size()
+
+    def put(self, key: str, value: object) -> None:
+        """
+        Updates key/value pair in the hash map. If the key already exists,
+        its associated value is replaced with the new value. Otherwise,
+        a new key/value pair is added.
+
+        :param key: string representing the key of the key/value pair
+        :param value: object associated with the key to be inserted
+        """
+        hash_value = self._hash_function(key)
+        index, stripe = self._lock_bucket(hash_value)
+        try:
+            bucket = self._buckets[index]
+            if bucket is _EMPTY_BUCKET:
+                bucket = LinkedList()
+                self._buckets[index] = bucket
+            # Change value if key exists, otherwise add node in the same pass
+            node, found = bucket.find_or_insert(key, hash_value, value,
+                                                self._move_to_front)
+            if found:
+                node.value = value
+                return
+            self._stripe_sizes[stripe] += 1
+            if bucket.length() > self._TREEIFY_THRESHOLD:
+                self._treeify(self._buckets, index)
+            # Only add up every stripe once this one is as full as the whole
+            # table may get
+            capacity = self._capacity
+            crowded = self._stripe_sizes[stripe] * self._stripes >= capacity
+        finally:
+            self._locks[stripe].release()
+
+        if crowded and self.get_size() >= capacity:
+            self._grow(capacity)
+
+    def _update(self, key: str, function: callable, default: object) \
+            -> object:
+        """
+        Replaces the value associated with the given key by function(value),
+        where value is the default if the key is not in the hash map yet,
+        all under the key's stripe lock.
+
+        :param key: string representing the key whose value is replaced
+        :param function: callable taking the current value and returning the
+        new one
+        :param default: object passed to function if the key is not present
+
+        :return: the new value associated with the key
+        """
+        hash_value = self._hash_function(key)
+        index, stripe = self._lock_bucket(hash_value)
+        try:
+            bucket = self._buckets[index]
+            if bucket is _EMPTY_BUCKET:
+                bucket = LinkedList()
+                self._buckets[index] = bucket
+            # Count a new key before calling function, so that the sizes
+            # stay right if function raises and the key keeps the default
+            node, found = bucket.find_or_insert(key, hash_value, default,
+                                                self._move_to_front)
+            if not found:
+                self._stripe_sizes[stripe] += 1
+            node.value = value = function(node.value)
+            if found:
+                return value
+            if bucket.length() > self._TREEIFY_THRESHOLD:
+                self._treeify(self._buckets, index)
+            capacity = self._capacity
+            crowded = self._stripe_sizes[stripe] * self._stripes >= capacity
+        finally:
+            self._locks[stripe].release()
+
+        if crowded and self.get_size() >= capacity:
+            self._grow(capacity)
+        return value
+
+    def increment(self, key: str, delta: int = 1) -> int:
+        """
+        Adds delta to the value associated with the given key, which counts
+        as 0 if the key is not in the hash map yet, atomically.
+
+        :param key: string representing the key whose value is increased
+        :param delta: number added to the value associated with the key
+
+        :return: the new value associated with the key
+        """
+        return self._update(key, lambda value: value + delta, 0)
+
+    def setdefault(self, key: str, default: object = None) -> object:
+        """
+        Returns the value associated with the given key. If the key is not
+        in the hash map, it is added with the default value first,
+        atomically.
+
+        :param key: string representing the key to be looked up
+        :param default: object associated with the key if it is added
+
+        :return: the value associated with the key
+        """
+        return self._update(key, lambda value: value, default)
+
+    def update_with(self, key: str, function: callable,
+                    default: object = None) -> object:
+        """
+        Replaces the value associated with the given key by function(value),
+        where value is the default if the key is not in the hash map yet.
+        function is called with the key's stripe locked, so it must not use
+        the hash map itself.
+
+        :param key: string representing the key whose value is replaced
+        :param function: callable taking the current value and returning the
+        new one
+        :param default: object passed to function if the key is not present
+
+        :return: the new value associated with the key
+        """
+        return self._update(key, function, default)
+
+    def get(self, key: str):
+        """
+        Returns the value associated with the given key. If the key is not
+        in the hash map, returns None.
+
+        :param key: string representing the key for which the value will be
+        returned
+        """
+        hash_value = self._hash_function(key)
+        index, stripe = self._lock_bucket(hash_value)
+        try:
+            node = self._buckets[index].find(key, hash_value,
+                                             self._move_to_front)
+            if node is None:
+                return None
+            return node.value
+        finally:
+            self._locks[stripe].release()
+
+    def contains_key(self, key: str) -> bool:
+        """
+        Returns True if key is in the hash map, otherwise returns False
+
+        :param key: string representing key being searched for in hash map
+
+        :return: boolean representing whether key is in hash map
+        """
+        hash_value = self._hash_function(key)
+        index, stripe = self._lock_bucket(hash_value)
+        try:
+            return self._buckets[index].find(
+                key, hash_value, self._move_to_front) is not None
+        finally:
+            self._locks[stripe].release()
+
+    def remove(self, key: str) -> None:
+        """
+        Removes the given key and its associated value from the hash map.
+        If the key is not in the hash map, the method does nothing.
+
+        :param key: string representing key for which its value will be removed
+        """
+        hash_value = self._hash_function(key)
+        index, stripe = self._lock_bucket(hash_value)
+        try:
+            bucket = self._buckets[index]
+            # Find and unlink the node in one pass over the chain
+            if bucket is not _EMPTY_BUCKET and \
+                    bucket.unlink(key, hash_value) is not None:
+                self._stripe_sizes[stripe] -= 1
+                self._shrink_bucket(self._buckets, index)
+        finally:
+            self._locks[stripe].release()
+
+    def put_many(self, pairs: DynamicArray) -> None:
+        """
+        Puts every key/value pair of the given array into the hash map, one
+        at a time, so other threads are not held up for the whole batch.
+
+        :param pairs: DynamicArray of (key, value) tuples to be inserted
+        """
+        for index in range(pairs.length()):
+            key, value = pairs[index]
+            self.put(key, value)
+
+    def get_many(self, keys: DynamicArray) -> DynamicArray:
+        """
+        Returns a dynamic array holding, at each index, the value associated
+        with the key at the same index of the given array, or None if that
+        key is not in the hash map.
+
+        :param keys: DynamicArray of keys to be looked up
+
+        :return: DynamicArray of values in the same order as keys
+        """
+        values = DynamicArray()
+        for index in range(keys.length()):
+            values.append(self.get(keys[index]))
+        return values
+
+    def remove_many(self, keys: DynamicArray) -> None:
+        """
+        Removes every key of the given array, and its associated value, from
+        the hash map. Keys that are not in the hash map are ignored.
+
+        :param keys: DynamicArray of keys to be removed
+        """
+        for index in range(keys.length()):
+            self.remove(keys[index])
+
+    # ------------------------------------------------------------------ #
+    # Whole-table operations take every stripe lock
+
+    def _grow(self, capacity: int) -> None:
+        """
+        Doubles the table as put does once the load factor reaches 1.0,
+        unless another thread has resized it since capacity was seen.
+
+        :param capacity: integer representing the capacity put saw
+        """
+        self._lock_all()
+        try:
+            if self._capacity == capacity:
+                self._size = self.get_size()
+                super().resize_table(capacity * 2)
+                self._recount_stripes()
+        finally:
+            self._unlock_all()
+
+    def resize_table(self, new_capacity: int) -> None:
+        """
+        Changes capacity of the internal hash table while keeping existing
+        key/value pairs in the new hash map.
+
+        :param new_capacity: integer representing the new capacity of the
+        hash table.
+        """
+        self._lock_all()
+        try:
+            self._size = self.get_size()
+            super().resize_table(new_capacity)
+            self._recount_stripes()
+        finally:
+            self._unlock_all()
+
+    def table_load(self) -> float:
+        """
+        Returns current hash table load factor.
+
+        :return: float representing hash table load factor.
+        """
+        return self.get_size() / self._capacity
+
+    def empty_buckets(self) -> int:
+        """
+        Returns the number of empty buckets in the hash table.
+
+        :return: int representing number of buckets in hash table
+        """
+        self._lock_all()
+        try:
+            return super().empty_buckets()
+        finally:
+            self._unlock_all()
+
+    def get_keys_and_values(self) -> DynamicArray:
+        """
+        Returns a dynamic array where each index contains a tuple of a
+        key/value pair stored in the hash map, all taken at one moment.
+
+        :return: DynamicArray containing tuples of key/value pairs stored in
+        the hash map.
+        """
+        self._lock_all()
+        try:
+            return super().get_keys_and_values()
+        finally:
+            self._unlock_all()
+
+    def get_stats(self) -> HashMapStats:
+        """
+        Returns the statistics kept since enable_stats was called, with the
+        histogram of chain lengths taken with every stripe lock held, or
+        None if statistics are not being kept.
+        """
+        self._lock_all()
+        try:
+            return super().get_stats()
+        finally:
+            self._unlock_all()
+
+    def _snapshot(self) -> DynamicArray:
+        """
+        Returns a DynamicArray holding a single chain with a copy of every
+        key/value pair, in table order, for an iterator to walk once the
+        stripe locks have been released again.
+        """
+        pairs = self.get_keys_and_values()
+        chain = LinkedList()
+        # insert adds at the front, so go backwards to keep the order
+        for index in range(pairs.length() - 1, -1, -1):
+            key, value = pairs[index]
+            chain.insert(key, value)
+        return DynamicArray([chain])
+
+    def __iter__(self) -> HashMapIterator:
+        """
+        Returns an iterator over copies of the nodes of the hash map, each
+        with key and value attributes, all taken at one moment.
+        """
+        return HashMapIterator(self._snapshot())
+
+    def keys(self) -> HashMapIterator:
+        """
+        Returns an iterator over the keys in the hash map at one moment.
+        """
+        return HashMapIterator(self._snapshot(), attrgetter('key'))
+
+    def values(self) -> HashMapIterator:
+        """
+        Returns an iterator over the values in the hash map at one moment.
+        """
+        return HashMapIterator(self._snapshot(), attrgetter('value'))
+
+    def items(self) -> HashMapIterator:
+        """
+        Returns an iterator over (key, value) tuples of the hash map at one
+        moment.
+        """
+        return HashMapIterator(self._snapshot(), attrgetter('key', 'value'))
+
+    def clear(self) -> None:
+        """
+        Clears the contents of the hash map without changing the underlying
+        hash table capacity.
+        """
+        self._lock_all()
+        try:
+            # put does not record the buckets it fills for HashMap.clear, so
+            # every bucket is reset
+            for index in range(self._capacity):
+                self._buckets[index] = _EMPTY_BUCKET
+            for stripe in range(self._stripes):
+                self._stripe_sizes[stripe] = 0
+            self._size = 0
+        finally:
+            self._unlock_all()
+
+
+# ------------------- BASIC TESTING ---------------------------------------- #
+
+if __name__ == "__main__":
+
+    print("\nStress test - concurrent put/get/remove/increment")
+    print("-------------------------------------------------")
+    threads_count = 8
+    keys_per_thread = 2000
+    m = ConcurrentHashMap(11, hash_function_1, stripes=8)
+    errors = []
+
+    def worker(number):
+        # Each thread owns its keys, so their final values are known; reads
+        # of the shared keys only check that a value is well formed
+        own = ['t' + str(number) + '-' + str(i)
+               for i in range(keys_per_thread)]
+        for i, key in enumerate(own):
+            m.put(key, i)
+            m.put('shared' + str(i % 50), number)
+            m.increment('counter' + str(i % 10))
+            if m.get(key) != i:
+                errors.append(('lost put', key))
+            shared = m.get('shared' + str((i * 7) % 50))
+            if shared is not None and not 0 <= shared < threads_count:
+                errors.append(('bad shared value', shared))
+            if i % 500 == 0:
+                # Iterate while the other threads put and resize
+                seen = set()
+                for pair_key, pair_value in m.items():
+                    if pair_key in seen or pair_value is None:
+                        errors.append(('bad iteration', pair_key))
+                    seen.add(pair_key)
+        for i, key in enumerate(own):
+            if i % 2 == 0:
+                m.remove(key)
+        for i, key in enumerate(own):
+            expected = None if i % 2 == 0 else i
+            if m.get(key) != expected:
+                errors.append(('wrong value', key, m.get(key), expected))
+
+    workers = [threading.Thread(target=worker, args=(number,))
+               for number in range(threads_count)]
+    for thread in workers:
+        thread.start()
+    for thread in workers:
+        thread.join()
+
+    expected_size = threads_count * keys_per_thread // 2 + 60
+    pairs = m.get_keys_and_values()
+    # No increment is lost between threads
+    for i in range(10):
+        if m.get('counter' + str(i)) != threads_count * keys_per_thread // 10:
+            errors.append(('lost increment', i, m.get('counter' + str(i))))
+    print(errors[:5])
+    print(m.get_size() == expected_size, pairs.length() == expected_size,
+          m.table_load() < 1.0, m.get_capacity())
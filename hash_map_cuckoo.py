@@ -0,0 +1,507 @@
+# Description: Implementation of a HashMap using cuckoo hashing
+
+from itertools import permutations
+
+from a6_include import (HASH_MASK, DynamicArray, HashEntry,
+                        hash_function_1, hash_function_2, is_prime,
+                        make_seeded_hash_function, next_prime)
+
+
+class HashMap:
+    # Number of entries a put may move between the two tables before the
+    # entry left over goes to the stash
+    _MAX_KICKS = 64
+
+    # Most entries the stash ever holds; a lookup reads at most two slots
+    # and this many stash entries
+    _STASH_SIZE = 4
+
+    def __init__(self,
+                 capacity: int = 11,
+                 function: callable = None,
+                 second_function: callable = None) -> None:
+        """
+        Initialize new HashMap that uses
+        cuckoo hashing for collision resolution
+
+        Every key has exactly one possible slot in each of two tables: the
+        first chosen by function and the second by second_function. If
+        both slots are taken, put moves the entry in the way to its slot in
+        the other table, and so on; an entry still without a slot after
+        _MAX_KICKS moves is kept in a stash of at most _STASH_SIZE entries.
+        get therefore reads at most two slots and the stash, however full
+        the table is.
+
+        Both functions default to independently seeded BLAKE2b functions
+        (make_seeded_hash_function). When an entry finds neither a slot nor
+        room in the stash, both functions are replaced by freshly seeded
+        ones, including functions given here, and every entry is placed
+        again at the same capacity.
+
+        capacity is the total number of slots in the two tables.
+        """
+        # Each table's capacity must be a prime number
+        self._table_capacity = self._next_prime((capacity + 1) // 2)
+        self._tables = (self._new_table(self._table_capacity),
+                        self._new_table(self._table_capacity))
+        self._stash = DynamicArray()
+
+        self._hash_function = function or make_seeded_hash_function()
+        self._second_function = \
+            second_function or make_seeded_hash_function()
+        self._size = 0
+
+    def __str__(self) -> str:
+        """
+        Override string method to provide more readable output
+        """
+        out = ''
+        for table in range(2):
+            for i in range(self._table_capacity):
+                out += str(table) + '.' + str(i) + ': ' + \
+                    str(self._tables[table][i]) + '\n'
+        for i in range(self._stash.length()):
+            out += 'stash: ' + str(self._stash[i]) + '\n'
+        return out
+
+    def _next_prime(self, capacity: int) -> int:
+        """
+        Increment from given number to find the closest prime number, using
+        the precomputed growth primes where possible
+        """
+        return next_prime(capacity)
+
+    @staticmethod
+    def _is_prime(capacity: int) -> bool:
+        """
+        Determine if given integer is a prime number and return boolean
+        """
+        return is_prime(capacity)
+
+    @staticmethod
+    def _new_table(capacity: int) -> DynamicArray:
+        """
+        Returns a table of the given number of empty slots.
+        """
+        return DynamicArray([None] * capacity)
+
+    def get_size(self) -> int:
+        """
+        Return size of map
+        """
+        return self._size
+
+    def get_capacity(self) -> int:
+        """
+        Return capacity of map: the number of slots in both tables
+        """
+        return 2 * self._table_capacity
+
+    # ------------------------------------------------------------------ #
+
+    def _second_hash(self, key: str) -> int:
+        """
+        Returns the hash of the given key that picks its slot in the second
+        table. The first hash is cached on the entry; this one is computed
+        when needed.
+
+        :param key: str representing the key
+
+        :return: int representing the hash of the key
+        """
+        return self._second_function(key) & HASH_MASK
+
+    def _slot_of(self, entry: HashEntry, table: int, capacity: int) -> int:
+        """
+        Returns the index of the slot the entry may take in the given table.
+
+        :param entry: HashEntry whose slot is wanted
+        :param table: int 0 or 1, the table
+        :param capacity: int representing the number of slots in a table
+
+        :return: int representing the slot index
+        """
+        if table == 0:
+            return entry.hash % capacity
+        return self._second_hash(entry.key) % capacity
+
+    def put(self, key: str, value: object) -> None:
+        """
+        Updates key/value pair in the hash map. If the key already exists,
+        its associated value is replaced with the new value. Otherwise,
+        a new key/value pair is added, and the tables are doubled in size
+        first if the load factor would reach 0.5.
+
+        :param key: string representing the key of the key/value pair
+        :param value: object associated with the key to be inserted
+        """
+        hash_value = self._hash_function(key) & HASH_MASK
+        entry = self._find_entry(key, hash_value)
+        if entry is not None:
+            entry.value = value
+            return
+
+        if (self._size + 1) / self.get_capacity() >= 0.5:
+            self.resize_table(self.get_capacity() * 2)
+
+        homeless = self._place(HashEntry(key, value, hash_value),
+                               self._tables, self._table_capacity)
+        self._size += 1
+        if homeless is None:
+            return
+        if self._stash.length() < self._STASH_SIZE:
+            self._stash.append(homeless)
+        else:
+            self._rebuild(self._table_capacity, homeless)
+
+    def _place(self, entry: HashEntry, tables: tuple,
+               capacity: int) -> HashEntry:
+        """
+        Stores an entry whose key is not in the tables: in its first free
+        slot if it has one, otherwise in its first-table slot, moving the
+        entry there to its slot in the other table, and so on.
+
+        :param entry: HashEntry to be stored
+        :param tables: tuple of the two DynamicArray tables
+        :param capacity: int representing the number of slots in a table
+
+        :return: HashEntry left without a slot after _MAX_KICKS moves, or
+        None once every entry has a slot
+        """
+        first = entry.hash % capacity
+        if tables[0][first] is None:
+            tables[0][first] = entry
+            return None
+        second = self._second_hash(entry.key) % capacity
+        if tables[1][second] is None:
+            tables[1][second] = entry
+            return None
+
+        table, index = 0, first
+        for _ in range(self._MAX_KICKS):
+            evicted = tables[table][index]
+            tables[table][index] = entry
+            if evicted is None:
+                return None
+            # The evicted entry's only other slot is in the other table
+            entry = evicted
+            table = 1 - table
+            index = self._slot_of(entry, table, capacity)
+        return entry
+
+    def _rebuild(self, table_capacity: int, extra: HashEntry = None) -> None:
+        """
+        Moves every entry, and extra if given, into new tables of at least
+        the given capacity each. Entries left without a slot go to the
+        stash; if more are left over than it holds, both hash functions
+        are replaced by freshly seeded ones and the entries placed again.
+
+        :param table_capacity: int representing the slots wanted per table
+        :param extra: HashEntry not yet stored anywhere, or None
+        """
+        entries = DynamicArray()
+        for table in self._tables:
+            for index in range(self._table_capacity):
+                if table[index] is not None:
+                    entries.append(table[index])
+        for index in range(self._stash.length()):
+            entries.append(self._stash[index])
+        if extra is not None:
+            entries.append(extra)
+
+        table_capacity = self._next_prime(table_capacity)
+        while True:
+            tables = (self._new_table(table_capacity),
+                      self._new_table(table_capacity))
+            stash = DynamicArray()
+            for index in range(entries.length()):
+                homeless = self._place(entries[index], tables, table_capacity)
+                if homeless is None:
+                    continue
+                if stash.length() == self._STASH_SIZE:
+                    break
+                stash.append(homeless)
+            else:
+                break
+            self._reseed(entries)
+
+        self._tables = tables
+        self._table_capacity = table_capacity
+        self._stash = stash
+
+    def _reseed(self, entries: DynamicArray) -> None:
+        """
+        Replaces both hash functions with freshly seeded ones and caches
+        the new first hash on every given entry.
+
+        :param entries: DynamicArray of every HashEntry in the map
+        """
+        self._hash_function = make_seeded_hash_function()
+        self._second_function = make_seeded_hash_function()
+        for index in range(entries.length()):
+            entry = entries[index]
+            entry.hash = self._hash_function(entry.key) & HASH_MASK
+
+    def resize_table(self, new_capacity: int) -> None:
+        """
+        Changes the capacity of the internal hash tables while keeping
+        existing key/value pairs in the new hash map.
+
+        :param new_capacity: int representing the total number of slots
+        """
+        if new_capacity <= self._size:
+            return
+
+        # Keep doubling, as put would while adding the entries back, until
+        # the load factor stays below 0.5
+        while self._size >= new_capacity * 0.5:
+            new_capacity *= 2
+
+        self._rebuild((new_capacity + 1) // 2)
+
+    def table_load(self) -> float:
+        """
+        Returns current hash table load factor.
+
+        :return: float representing load factor
+        """
+        return self._size / self.get_capacity()
+
+    def empty_buckets(self) -> int:
+        """
+        Returns the number of empty slots in the two tables.
+
+        :return: int representing number of empty slots
+        """
+        return self.get_capacity() - (self._size - self._stash.length())
+
+    def _find_entry(self, key: str, hash_value: int) -> HashEntry:
+        """
+        Returns the entry for the given key: in its first-table slot, its
+        second-table slot or the stash.
+
+        :param key: str representing key being searched for
+        :param hash_value: int first hash of the key
+
+        :return: HashEntry for the key, or None if the key is not present
+        """
+        entry = self._tables[0][hash_value % self._table_capacity]
+        if entry is not None and entry.hash == hash_value and \
+                entry.key == key:
+            return entry
+
+        entry = self._tables[1][self._second_hash(key) %
+                                self._table_capacity]
+        if entry is not None and entry.hash == hash_value and \
+                entry.key == key:
+            return entry
+
+        for index in range(self._stash.length()):
+            entry = self._stash[index]
+            if entry.hash == hash_value and entry.key == key:
+                return entry
+        return None
+
+    def get(self, key: str) -> object:
+        """
+        Returns the value associated with the given key. Returns None if the
+        key is not in the hash map.
+
+        :param key: str representing key for value to return
+
+        :return: object associated with key
+        """
+        entry = self._find_entry(key, self._hash_function(key) & HASH_MASK)
+        if entry is None:
+            return None
+        return entry.value
+
+    def contains_key(self, key: str) -> bool:
+        """
+        Returns True if given key is in the hash map, otherwise returns False.
+
+        :param key: str representing key being search for
+
+        :return: bool representing whether key is in the hash map
+        """
+        return self._find_entry(
+            key, self._hash_function(key) & HASH_MASK) is not None
+
+    def remove(self, key: str) -> None:
+        """
+        Removes given key and its associated value from hash map. If key is
+        not in the hash map, does nothing.
+
+        :param key: string representing key/item pair to be removed.
+        """
+        hash_value = self._hash_function(key) & HASH_MASK
+        capacity = self._table_capacity
+
+        for table, index in ((0, hash_value % capacity),
+                             (1, self._second_hash(key) % capacity)):
+            entry = self._tables[table][index]
+            if entry is not None and entry.hash == hash_value and \
+                    entry.key == key:
+                self._tables[table][index] = None
+                self._size -= 1
+                self._unstash_into(table, index)
+                return
+
+        for index in range(self._stash.length()):
+            entry = self._stash[index]
+            if entry.hash == hash_value and entry.key == key:
+                self._stash.swap(index, self._stash.length() - 1)
+                self._stash.pop()
+                self._size -= 1
+                return
+
+    def _unstash_into(self, table: int, index: int) -> None:
+        """
+        Moves a stashed entry, if one belongs there, into the table slot
+        just freed.
+
+        :param table: int 0 or 1, the table of the free slot
+        :param index: int representing the index of the free slot
+        """
+        for position in range(self._stash.length()):
+            entry = self._stash[position]
+            if self._slot_of(entry, table, self._table_capacity) == index:
+                self._tables[table][index] = entry
+                self._stash.swap(position, self._stash.length() - 1)
+                self._stash.pop()
+                return
+
+    def get_keys_and_values(self) -> DynamicArray:
+        """
+        Returns a dynamic array where each index contains a tuple of a
+        key/value pair in the hash map
+
+        :return: DynamicArray containing tuples of key/value pairs in hash map
+        """
+        arr = DynamicArray()
+        for table in self._tables:
+            for index in range(self._table_capacity):
+                if table[index] is not None:
+                    arr.append((table[index].key, table[index].value))
+        for index in range(self._stash.length()):
+            arr.append((self._stash[index].key, self._stash[index].value))
+        return arr
+
+    def clear(self) -> None:
+        """
+        Clears the contents of the hash map without changing the underlying
+        hash table capacity.
+        """
+        # Empty the slots in place rather than allocating new tables
+        if self._size == 0:
+            return
+        for table in self._tables:
+            for index in range(self._table_capacity):
+                table[index] = None
+        while self._stash.length() > 0:
+            self._stash.pop()
+        self._size = 0
+
+
+# ------------------- BASIC TESTING ---------------------------------------- #
+
+if __name__ == "__main__":
+
+    print("\nPDF - put example 1")
+    print("-------------------")
+    m = HashMap(53, hash_function_1)
+    for i in range(150):
+        m.put('str' + str(i), i * 100)
+        if i % 25 == 24:
+            print(m.empty_buckets(), round(m.table_load(), 2), m.get_size(), m.get_capacity())
+
+    print("\nPDF - get example 2")
+    print("-------------------")
+    m = HashMap(151, hash_function_2)
+    for i in range(200, 300, 7):
+        m.put(str(i), i * 10)
+    print(m.get_size(), m.get_capacity())
+    for i in range(200, 300, 21):
+        print(i, m.get(str(i)), m.get(str(i)) == i * 10)
+        print(i + 1, m.get(str(i + 1)), m.get(str(i + 1)) == (i + 1) * 10)
+
+    print("\nPDF - contains_key example 2")
+    print("----------------------------")
+    m = HashMap(79, hash_function_2)
+    keys = [i for i in range(1, 1000, 20)]
+    for key in keys:
+        m.put(str(key), key * 42)
+    print(m.get_size(), m.get_capacity())
+    result = True
+    for key in keys:
+        # all inserted keys must be present
+        result &= m.contains_key(str(key))
+        # NOT inserted keys must be absent
+        result &= not m.contains_key(str(key + 1))
+    print(result)
+
+    print("\nPDF - remove example 1")
+    print("----------------------")
+    m = HashMap(53, hash_function_1)
+    print(m.get('key1'))
+    m.put('key1', 10)
+    print(m.get('key1'))
+    m.remove('key1')
+    print(m.get('key1'))
+    m.remove('key4')
+
+    print("\nPDF - get_keys_and_values example 1")
+    print("------------------------")
+    m = HashMap(11, hash_function_2)
+    for i in range(1, 6):
+        m.put(str(i), str(i * 10))
+    print(m.get_keys_and_values())
+
+    m.resize_table(2)
+    print(m.get_keys_and_values())
+
+    m.put('20', '200')
+    m.remove('1')
+    m.resize_table(12)
+    print(m.get_keys_and_values())
+
+    print("\nPDF - clear example 1")
+    print("---------------------")
+    m = HashMap(101, hash_function_1)
+    print(m.get_size(), m.get_capacity())
+    m.put('key1', 10)
+    m.put('key2', 20)
+    m.put('key1', 30)
+    print(m.get_size(), m.get_capacity())
+    m.clear()
+    print(m.get_size(), m.get_capacity())
+
+    print("\nStash example")
+    print("-------------")
+    # Anagrams share their first hash (a sum of character codes), so only
+    # one of them fits in the first table; the rest need their slot in the
+    # second table, or else the stash. Placement may pick new functions, so
+    # the pairs are sorted for printing
+    m = HashMap(11, hash_function_1)
+    for key in ('abc', 'acb', 'bac', 'bca', 'cab', 'cba'):
+        m.put(key, key.upper())
+    pairs = m.get_keys_and_values()
+    print(m.get_size(), m.get_capacity(), m._stash.length() <= 4)
+    print(sorted(pairs[i] for i in range(pairs.length())))
+
+    print("\nStash bound")
+    print("-----------")
+    # The stash never holds more than _STASH_SIZE entries, whatever the
+    # keys and functions
+    sequential = ['str' + str(i) for i in range(20000)]
+    anagrams = [''.join(p) for p in permutations('abcdefg')]
+    for keys in (sequential, anagrams):
+        for functions in ((), (hash_function_1,), (hash_function_2,),
+                          (hash_function_1, hash_function_2)):
+            m = HashMap(11, *functions)
+            for key in keys:
+                m.put(key, key)
+            result = m._stash.length() <= HashMap._STASH_SIZE
+            for key in keys:
+                result &= m.get(key) == key
+            print(len(keys), m.get_size(), m.get_capacity(), result)
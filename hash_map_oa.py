@@ -1,25 +1,142 @@
 # Description: Implementation of a HashMap using open addressing
 
-from a6_include import (DynamicArray, DynamicArrayException, HashEntry,
-                        hash_function_1, hash_function_2)
+from operator import attrgetter
+from time import perf_counter
+
+from a6_include import (HASH_MASK, CompactEntryArray, DynamicArray,
+                        HashEntry, HashMapStats, add_to_histogram,
+                        hash_function_1, hash_function_2,
+                        is_prime, next_prime)
+
+
+# Fills old-table slots whose entry has moved during an incremental resize;
+# it keeps probe sequences through the slot intact and never matches a key
+_MIGRATED = HashEntry(None, None)
+_MIGRATED.is_tombstone = True
+
+
+class HashMapIterator:
+    """
+    Iterator over the live entries of a HashMap, reading the slots in place
+    rather than copying them out as get_keys_and_values does. Each iterator
+    keeps its own position, so several can run over the same map at once.
+    The map must not be changed while it is being iterated over.
+    """
+    __slots__ = ('_buckets', '_index', '_view')
+
+    def __init__(self, buckets, view: callable = None) -> None:
+        """
+        Initialize new iterator over the given slots, returning view(entry)
+        for each live entry, or the entry itself if view is None.
+        """
+        self._buckets = buckets
+        self._index = 0
+        self._view = view
+
+    def __iter__(self) -> "HashMapIterator":
+        """Return the iterator itself."""
+        return self
+
+    def __next__(self):
+        """
+        Returns the next live entry, or what the view makes of it.
+        """
+        buckets = self._buckets
+        index = self._index
+        length = buckets.length()
+        while index < length:
+            entry = buckets[index]
+            index += 1
+            # Skip over empty slots and tombstones
+            if entry is not None and entry.is_tombstone is False:
+                self._index = index
+                if self._view is None:
+                    return entry
+                return self._view(entry)
+        self._index = index
+        raise StopIteration
 
 
 class HashMap:
-    def __init__(self, capacity: int, function) -> None:
+    # Number of old slots migrated per operation during incremental resize;
+    # two is enough to finish before the new table needs to grow again
+    _REHASH_STEP = 2
+
+    # Load factor at which put grows the table, for each probing strategy.
+    # Quadratic probing is only sure to find a free slot below 0.5; Robin
+    # Hood keeps probe sequences short enough to run much fuller
+    _MAX_LOAD = {'linear': 0.5, 'quadratic': 0.5, 'double': 0.5,
+                 'robin_hood': 0.9}
+
+    def __init__(self, capacity: int, function,
+                 incremental: bool = False, compact: bool = False,
+                 shrink: bool = False, probing: str = 'quadratic',
+                 second_function: callable = hash_function_2) -> None:
         """
         Initialize new HashMap that uses
         quadratic probing for collision resolution
-        DO NOT CHANGE THIS METHOD IN ANY WAY
+
+        probing selects another strategy: 'linear' probes consecutive
+        slots, which keeps probes for small keys close together in memory,
+        and 'double' steps through the table by an amount taken from
+        second_function, so keys sharing a home slot follow different
+        sequences.
+
+        When probing is 'robin_hood', collisions are resolved by linear
+        probing, keeping each run of slots ordered by home slot: a new key
+        takes the place of the first entry closer to its own home slot, and
+        remove shifts the rest of the run back rather than leaving a
+        tombstone. Probe lengths stay short and even up to a load factor of
+        0.9, where the table grows.
+
+        When incremental is True, growing the table keeps the old slots
+        alongside the new ones and migrates a bounded number of them on
+        every operation instead of rehashing everything in one put.
+
+        When compact is True, slots are stored in a CompactEntryArray
+        (parallel arrays of hashes, keys, values and state bytes) instead of
+        one HashEntry object per slot.
+
+        When shrink is True, remove halves the capacity (never below the
+        initial capacity) once the load factor drops under a quarter of the
+        load at which the table grows (0.125 for quadratic probing). Either
+        resize leaves the load near half of the growth load, well away from
+        both thresholds.
         """
-        self._buckets = DynamicArray()
+        self._compact = compact
+        self._max_load = self._max_load_for(probing)
+        self._robin_hood = probing == 'robin_hood'
+        # Probe sequences advance by a step that itself grows by
+        # _step_growth after each probe: 1, 3, 5, ... adds up to the squares
+        # of quadratic probing
+        self._step_growth = 2 if probing == 'quadratic' else 0
+        self._double = probing == 'double'
+        self._second_function = second_function
 
         # capacity must be a prime number
         self._capacity = self._next_prime(capacity)
-        for _ in range(self._capacity):
-            self._buckets.append(None)
+        self._buckets = self._new_buckets(self._capacity)
 
         self._hash_function = function
         self._size = 0
+        # Number of tombstones in the current table
+        self._tombstones = 0
+        # Indices of the slots written since the last clear, or None once
+        # there are too many to be worth tracking
+        self._written = DynamicArray()
+
+        self._shrink = shrink
+        self._min_capacity = self._capacity
+
+        # State of an in-progress incremental resize
+        self._incremental = incremental
+        self._old_buckets = None
+        self._old_capacity = 0
+        self._rehash_index = 0
+
+        # HashMapStats once enable_stats is called; every operation checks
+        # for None first, so the counters cost nothing until then
+        self._stats = None
 
     def __str__(self) -> str:
         """
@@ -33,36 +150,74 @@ class HashMap:
 
     def _next_prime(self, capacity: int) -> int:
         """
-        Increment from given number to find the closest prime number
-        DO NOT CHANGE THIS METHOD IN ANY WAY
+        Increment from given number to find the closest prime number, using
+        the precomputed growth primes where possible
         """
-        if capacity % 2 == 0:
-            capacity += 1
-
-        while not self._is_prime(capacity):
-            capacity += 2
-
-        return capacity
+        return next_prime(capacity)
 
     @staticmethod
     def _is_prime(capacity: int) -> bool:
         """
         Determine if given integer is a prime number and return boolean
-        DO NOT CHANGE THIS METHOD IN ANY WAY
         """
-        if capacity == 2 or capacity == 3:
-            return True
+        return is_prime(capacity)
 
-        if capacity == 1 or capacity % 2 == 0:
-            return False
+    def enable_stats(self) -> None:
+        """
+        Starts keeping statistics of the hash map from zero, see
+        HashMapStats.
+        """
+        self._stats = HashMapStats()
 
-        factor = 3
-        while factor ** 2 <= capacity:
-            if capacity % factor == 0:
-                return False
-            factor += 2
+    def disable_stats(self) -> None:
+        """
+        Stops keeping statistics of the hash map.
+        """
+        self._stats = None
+
+    def get_stats(self) -> HashMapStats:
+        """
+        Returns the statistics kept since enable_stats was called, with the
+        histogram of probe lengths and the tombstone count of the table as
+        it is now, or None if statistics are not being kept.
+        """
+        if self._stats is None:
+            return None
+        self._finish_rehash()
+
+        probe_lengths = DynamicArray()
+        for index in range(self._capacity):
+            entry = self._buckets[index]
+            if entry is not None and entry.is_tombstone is False:
+                add_to_histogram(probe_lengths, self._probe_count(index))
+        self._stats.probe_lengths = probe_lengths
+        self._stats.tombstones = self._tombstones
+        return self._stats
+
+    def _probe_count(self, index: int) -> int:
+        """
+        Returns the number of slots get visits to find the entry in the slot
+        at the given index, following the same probe sequence.
 
-        return True
+        :param index: int representing the index of a live entry
+
+        :return: int number of probes, 1 for an entry in its home slot
+        """
+        entry = self._buckets[index]
+        probe = entry.hash % self._capacity
+        if self._robin_hood:
+            return (index - probe) % self._capacity + 1
+
+        step = 0
+        count = 1
+        while probe != index:
+            if step == 0:
+                step = self._first_step(entry.key, self._capacity)
+            else:
+                step += self._step_growth
+            probe = (probe + step) % self._capacity
+            count += 1
+        return count
 
     def get_size(self) -> int:
         """
@@ -78,6 +233,91 @@ class HashMap:
         """
         return self._capacity
 
+    def _first_step(self, key: str, capacity: int) -> int:
+        """
+        Returns the distance from the home slot of the given key to the
+        second slot of its probe sequence.
+
+        :param key: str representing the key being probed for
+        :param capacity: int representing the number of slots in the table
+
+        :return: int representing the first step of the probe sequence
+        """
+        if not self._double:
+            return 1
+        # Any step below a prime capacity reaches every slot
+        return 1 + (self._second_function(key) & HASH_MASK) % \
+            max(1, capacity - 1)
+
+    def _new_buckets(self, capacity: int):
+        """
+        Returns an empty table of the given number of slots in the storage
+        chosen at construction.
+        """
+        if self._compact:
+            return CompactEntryArray(capacity)
+        return DynamicArray([None] * capacity)
+
+    @classmethod
+    def _max_load_for(cls, probing: str) -> float:
+        """
+        Returns the load factor at which the table grows for the given
+        probing strategy.
+
+        :param probing: str naming the probing strategy
+
+        :return: float representing the maximum load factor
+        """
+        if probing not in cls._MAX_LOAD:
+            raise ValueError(
+                "probing must be one of " +
+                ", ".join(repr(name) for name in cls._MAX_LOAD) +
+                ", not " + repr(probing))
+        return cls._MAX_LOAD[probing]
+
+    @classmethod
+    def with_expected_size(cls, count: int, function: callable,
+                           **options) -> "HashMap":
+        """
+        Returns an empty HashMap whose capacity is chosen once, up front, so
+        that count entries can be added without the table being resized.
+
+        :param count: int representing the expected number of entries
+        :param function: hash function used by the map
+        :param options: keyword options passed on to the constructor
+
+        :return: HashMap with room for count entries
+        """
+        max_load = cls._max_load_for(options.get('probing', 'quadratic'))
+        return cls(cls._capacity_for(count, max_load), function, **options)
+
+    @classmethod
+    def from_items(cls, items, function: callable,
+                   **options) -> "HashMap":
+        """
+        Returns a HashMap holding the given key/value pairs, sized once for
+        all of them so no resize happens while they are added.
+
+        :param items: DynamicArray or other iterable of (key, value) tuples
+        :param function: hash function used by the map
+        :param options: keyword options passed on to the constructor
+
+        :return: HashMap containing the pairs
+        """
+        # DynamicArray does not support iteration; copy other iterables into
+        # one so the number of pairs is known before sizing the table
+        if isinstance(items, DynamicArray):
+            pairs = items
+        else:
+            pairs = DynamicArray()
+            for pair in items:
+                pairs.append(pair)
+
+        hash_map = cls.with_expected_size(pairs.length(), function,
+                                          **options)
+        hash_map.put_many(pairs)
+        return hash_map
+
     # ------------------------------------------------------------------ #
 
     def put(self, key: str, value: object) -> None:
@@ -89,43 +329,445 @@ class HashMap:
         :param key: string representing the key of the key/value pair
         :param value: object associated with the key to be inserted.
         """
+        if self._stats is not None:
+            self._stats.puts += 1
+        self._make_room()
+
+        hash_value = self._hash_function(key) & HASH_MASK
+        if self._old_buckets is not None:
+            self._rehash_step()
+            self._retire_old_entry(key, hash_value)
+
+        self._insert(key, value, hash_value)
+
+    def _make_room(self) -> None:
+        """
+        Resizes the table before a key is added if the load factor would
+        reach the maximum for the probing strategy.
+        """
+        # Count tombstones as well, since they lengthen probe sequences
+        if (self._size + self._tombstones) / self._buckets.length() >= \
+                self._max_load:
+            # If the table is mostly tombstones, drop them without growing;
+            # migration skips tombstones, so an incremental resize to the
+            # same capacity drops them a few slots at a time
+            if self.table_load() < self._max_load / 2:
+                self._resize(self._capacity)
+            else:
+                self._resize(self._capacity*2)
+
+    def _upsert(self, key: str, default: object) -> HashEntry:
+        """
+        Returns the entry holding the given key, first adding the key with
+        the default value if it is not in the hash map. The key is hashed
+        and probed for once, so the value can then be read and changed
+        without another lookup.
+
+        :param key: string representing the key to be found or added
+        :param default: object associated with the key if it is added
+
+        :return: HashEntry (or compact view) of the key in the current table
+        """
+        if self._stats is not None:
+            self._stats.upserts += 1
+        self._make_room()
+
+        hash_value = self._hash_function(key) & HASH_MASK
+        if self._old_buckets is not None:
+            self._rehash_step()
+            # A key not migrated yet moves to the new table with its value
+            retired = self._retire_old_entry(key, hash_value)
+            if retired is not None:
+                default = retired.value
+
+        return self._buckets[self._insert(key, default, hash_value, False)]
+
+    def increment(self, key: str, delta: int = 1) -> int:
+        """
+        Adds delta to the value associated with the given key, which counts
+        as 0 if the key is not in the hash map yet, with one lookup where
+        contains_key, get and put would take three.
+
+        :param key: string representing the key whose value is increased
+        :param delta: number added to the value associated with the key
+
+        :return: the new value associated with the key
+        """
+        entry = self._upsert(key, 0)
+        entry.value += delta
+        return entry.value
 
-        if self.table_load() >= 0.5:
-            self.resize_table(self._capacity*2)
+    def setdefault(self, key: str, default: object = None) -> object:
+        """
+        Returns the value associated with the given key. If the key is not
+        in the hash map, it is added with the default value first.
+
+        :param key: string representing the key to be looked up
+        :param default: object associated with the key if it is added
+
+        :return: the value associated with the key
+        """
+        return self._upsert(key, default).value
+
+    def update_with(self, key: str, function: callable,
+                    default: object = None) -> object:
+        """
+        Replaces the value associated with the given key by function(value),
+        where value is the default if the key is not in the hash map yet.
+
+        :param key: string representing the key whose value is replaced
+        :param function: callable taking the current value and returning the
+        new one
+        :param default: object passed to function if the key is not present
+
+        :return: the new value associated with the key
+        """
+        entry = self._upsert(key, default)
+        entry.value = function(entry.value)
+        return entry.value
+
+    def _insert(self, key: str, value: object, hash_value: int,
+                replace: bool = True) -> int:
+        """
+        Adds the key/value pair to the current table, or replaces the value
+        if the key is already there and replace is True. The caller is
+        responsible for keeping the load factor below the maximum for the
+        probing strategy.
+
+        :param key: string representing the key of the key/value pair
+        :param value: object associated with the key to be inserted
+        :param hash_value: int hash of the key
+        :param replace: bool, False to keep the value of a key already there
+
+        :return: int index of the slot holding the key
+        """
+        if self._robin_hood:
+            return self._insert_robin_hood(key, value, hash_value, replace)
 
         # Get index
-        index = self._hash_function(key) % self._capacity
+        index = hash_value % self._capacity
 
         # Insert key/value if nothing is at the index
         if self._buckets[index] is None:
-            self._buckets[index] = HashEntry(key, value)
+            self._buckets[index] = HashEntry(key, value, hash_value)
             self._size += 1
+            self._track_write(index)
+            return index
         # If something is already at that index
         else:
-            j = 1
-            quad_probe = index
-            while self._buckets[quad_probe] is not None:
-                # If item at this index is the key
-                if self._buckets[quad_probe].key == key:
-                    # If this was a tombstone, add key/value and increase size
-                    if self._buckets[quad_probe].is_tombstone is True:
-                        self._buckets[quad_probe] = HashEntry(key, value)
-                        self._buckets[quad_probe].is_tombstone = False
+            step = self._first_step(key, self._capacity)
+            probe = index
+            first_tombstone = -1
+            while self._buckets[probe] is not None:
+                # If item at this index is the key; the cached hash rules out
+                # most other keys without comparing strings
+                entry = self._buckets[probe]
+                if entry.hash == hash_value and entry.key == key:
+                    # If this was a tombstone, revive it with the new value
+                    # and increase size
+                    if entry.is_tombstone is True:
+                        entry.value = value
+                        entry.is_tombstone = False
+                        self._tombstones -= 1
                         self._size += 1
-                    else:
-                        # Do not increment size because just replacing value
-                        self._buckets[quad_probe] = HashEntry(key, value)
-                    return
-                # Calculate next quadratic probe and increment j for next pass
-                quad_probe = (index + j**2) % self._capacity
-                j += 1
-
-            # If we reach a quad_probe index that is not occupied, add and
+                    # Otherwise do not increment size; update the entry in
+                    # place rather than allocating a new one
+                    elif replace:
+                        entry.value = value
+                    return probe
+                # Remember the first tombstone so a new key can reuse it
+                if first_tombstone == -1 and entry.is_tombstone is True:
+                    first_tombstone = probe
+                # Calculate next probe and the step after it
+                probe = (probe + step) % self._capacity
+                step += self._step_growth
+
+            # The key is not in the table: add it in the first tombstone
+            # passed, or else at the probe index that is not occupied, and
             # increment size
-            self._buckets[quad_probe] = HashEntry(key, value)
+            if first_tombstone != -1:
+                probe = first_tombstone
+                self._tombstones -= 1
+            else:
+                self._track_write(probe)
+            self._buckets[probe] = HashEntry(key, value, hash_value)
             self._size += 1
+            return probe
+
+    def _insert_robin_hood(self, key: str, value: object, hash_value: int,
+                           replace: bool = True) -> int:
+        """
+        Robin Hood counterpart of _insert: walks the linear probe sequence
+        until it finds the key, an empty slot, or an entry closer to its
+        own home slot than the key is to its home, which gives up its slot.
+
+        :param key: string representing the key of the key/value pair
+        :param value: object associated with the key to be inserted
+        :param hash_value: int hash of the key
+        :param replace: bool, False to keep the value of a key already there
+
+        :return: int index of the slot holding the key
+        """
+        buckets = self._buckets
+        capacity = self._capacity
+        index = hash_value % capacity
+        distance = 0
+        while True:
+            entry = buckets[index]
+            if entry is None:
+                break
+            if entry.hash == hash_value and entry.key == key:
+                if replace:
+                    entry.value = value
+                return index
+            if (index - entry.hash % capacity) % capacity < distance:
+                break
+            index = (index + 1) % capacity
+            distance += 1
+
+        empty = self._shift_in(HashEntry(key, value, hash_value), index,
+                               buckets, capacity)
+        self._size += 1
+        self._track_write(empty)
+        return index
+
+    def _place_robin_hood(self, entry: HashEntry, buckets: DynamicArray,
+                          capacity: int) -> int:
+        """
+        Stores an entry whose key is known not to be in the table at its
+        Robin Hood position.
 
+        :param entry: HashEntry (or compact view) to be stored
+        :param buckets: DynamicArray or CompactEntryArray of slots
+        :param capacity: int representing the number of slots in buckets
 
+        :return: int index of the previously empty slot now in use
+        """
+        index = entry.hash % capacity
+        distance = 0
+        while True:
+            resident = buckets[index]
+            if resident is None or \
+                    (index - resident.hash % capacity) % capacity < distance:
+                return self._shift_in(entry, index, buckets, capacity)
+            index = (index + 1) % capacity
+            distance += 1
+
+    @staticmethod
+    def _shift_in(entry: HashEntry, index: int, buckets: DynamicArray,
+                  capacity: int) -> int:
+        """
+        Stores entry at the given index after moving every entry from there
+        up to the next empty slot one slot along. Moving the whole run keeps
+        it ordered by home slot, as Robin Hood probing requires.
+
+        :param entry: HashEntry (or compact view) to be stored
+        :param index: int representing the slot entry belongs in
+        :param buckets: DynamicArray or CompactEntryArray of slots
+        :param capacity: int representing the number of slots in buckets
+
+        :return: int index of the previously empty slot now in use
+        """
+        empty = index
+        while buckets[empty] is not None:
+            empty = (empty + 1) % capacity
+
+        # Swap the empty slot back to index one step at a time
+        slot = empty
+        while slot != index:
+            previous = (slot - 1) % capacity
+            buckets.swap(previous, slot)
+            slot = previous
+        buckets[index] = entry
+        return empty
+
+    def _shift_out(self, index: int) -> None:
+        """
+        Removes the entry at the given index of the current table without a
+        tombstone (Robin Hood probing): the entries after it that are not
+        in their home slot each move back one slot.
+
+        :param index: int representing the slot to be emptied
+        """
+        buckets = self._buckets
+        capacity = self._capacity
+        buckets[index] = None
+        next_index = (index + 1) % capacity
+        entry = buckets[next_index]
+        while entry is not None and entry.hash % capacity != next_index:
+            buckets.swap(index, next_index)
+            index = next_index
+            next_index = (index + 1) % capacity
+            entry = buckets[next_index]
+
+    def _track_write(self, index: int) -> None:
+        """
+        Records that the empty slot at the given index has been written, so
+        that clear only has to reset the slots in use. Tracking stops once a
+        quarter of the table has been written; clear then resets every slot.
+
+        :param index: int representing the slot index
+        """
+        written = self._written
+        if written is not None:
+            if written.length() < self._capacity // 4:
+                written.append(index)
+            else:
+                self._written = None
+
+    def _resize(self, new_capacity: int) -> None:
+        """
+        Resizes the table as chosen at construction: incrementally or all at
+        once with resize_table.
+
+        :param new_capacity: int representing the requested capacity
+        """
+        if self._incremental:
+            self._start_rehash(new_capacity)
+        else:
+            self.resize_table(new_capacity)
+
+    def _shrink_if_sparse(self) -> None:
+        """
+        If shrinking is enabled and the load factor has dropped under a
+        quarter of the maximum load, halves the capacity as many times as
+        needed to bring it back up, but not below the initial capacity.
+        """
+        if not self._shrink:
+            return
+
+        new_capacity = self._capacity
+        while new_capacity > self._min_capacity and \
+                self._size / new_capacity < self._max_load / 4:
+            new_capacity = max(new_capacity // 2, self._min_capacity)
+        if new_capacity != self._capacity:
+            self._resize(new_capacity)
+
+    @staticmethod
+    def _capacity_for(count: int, max_load: float = 0.5) -> int:
+        """
+        Returns the smallest capacity that holds count entries without put
+        having to grow the table.
+
+        :param count: int representing the number of entries
+        :param max_load: float load factor at which put grows the table
+
+        :return: int representing the capacity
+        """
+        return max(1, int((count - 1) / max_load) + 1)
+
+    def _start_rehash(self, new_capacity: int) -> None:
+        """
+        Begins an incremental resize: the current slots become the old table
+        and an empty table of the new capacity takes their place.
+
+        :param new_capacity: int representing the requested capacity
+        """
+        self._finish_rehash()
+        if self._stats is not None:
+            self._stats.resizes += 1
+
+        self._old_buckets = self._buckets
+        self._old_capacity = self._capacity
+        self._rehash_index = 0
+
+        self._capacity = self._next_prime(new_capacity)
+        self._buckets = self._new_buckets(self._capacity)
+        self._tombstones = 0
+        self._written = None
+
+    def _migrate_slot(self, index: int) -> None:
+        """
+        Moves the live entry in the old slot at the given index, if any, into
+        the new table and leaves the _MIGRATED marker in its place.
+        Tombstones are not moved, but are replaced by the marker too, so
+        the removed entries are freed a few at a time rather than all at
+        once when the old table is dropped.
+
+        :param index: int representing the old slot index
+        """
+        entry = self._old_buckets[index]
+        if entry is None or entry is _MIGRATED:
+            return
+        if entry.is_tombstone:
+            self._old_buckets[index] = _MIGRATED
+            return
+
+        if self._robin_hood:
+            self._place_robin_hood(entry, self._buckets, self._capacity)
+            self._old_buckets[index] = _MIGRATED
+            return
+
+        # Keys are unique across both tables, so the entry can take the first
+        # free or tombstoned slot of its probe sequence
+        probe = entry.hash % self._capacity
+        step = self._first_step(entry.key, self._capacity)
+        while self._buckets[probe] is not None and \
+                self._buckets[probe].is_tombstone is False:
+            probe = (probe + step) % self._capacity
+            step += self._step_growth
+        if self._buckets[probe] is not None:
+            self._tombstones -= 1
+        self._buckets[probe] = entry
+
+        # Only overwrite the old slot once the entry has been copied, as with
+        # compact storage entry is a view of that slot
+        self._old_buckets[index] = _MIGRATED
+
+    def _rehash_step(self) -> None:
+        """
+        Migrates the next _REHASH_STEP old slots, dropping the old table once
+        all of its slots have been visited.
+        """
+        if self._stats is not None:
+            start = perf_counter()
+        end = min(self._rehash_index + self._REHASH_STEP, self._old_capacity)
+        for index in range(self._rehash_index, end):
+            self._migrate_slot(index)
+        self._rehash_index = end
+
+        if end == self._old_capacity:
+            self._old_buckets = None
+        if self._stats is not None:
+            self._stats.resize_seconds += perf_counter() - start
+
+    def _finish_rehash(self) -> None:
+        """
+        Completes any in-progress incremental resize.
+        """
+        if self._old_buckets is not None:
+            if self._stats is not None:
+                start = perf_counter()
+            for index in range(self._rehash_index, self._old_capacity):
+                self._migrate_slot(index)
+            self._old_buckets = None
+            if self._stats is not None:
+                self._stats.resize_seconds += perf_counter() - start
+
+    def _retire_old_entry(self, key: str, hash_value: int) -> HashEntry:
+        """
+        Tombstones the given key in the old table if it has not been migrated
+        yet, so that put can store it in the new table instead. A key is
+        never live in both tables at once.
+
+        :param key: str representing the key about to be written
+        :param hash_value: int hash of the key
+
+        :return: the retired HashEntry (or compact view), whose value is
+        still readable, or None if the key was not live in the old table
+        """
+        if self._old_buckets is None or self._find_index(
+                key, hash_value, self._buckets, self._capacity) != -1:
+            return None
+
+        index = self._find_index(key, hash_value, self._old_buckets,
+                                 self._old_capacity)
+        if index == -1:
+            return None
+        entry = self._old_buckets[index]
+        entry.is_tombstone = True
+        self._size -= 1
+        return entry
 
     def resize_table(self, new_capacity: int) -> None:
         """
@@ -137,27 +779,45 @@ class HashMap:
         if new_capacity <= self._size:
             return
 
-        # Check if prime; if it is, use for new capacity
-        if self._is_prime(new_capacity):
-            resized_table = HashMap(new_capacity, self._hash_function)
-            # If not prime, use next prime number
-        else:
-            resized_table = HashMap(self._next_prime(new_capacity),
-                                    self._hash_function)
-        # If new_capacity is 2, a prime number, set as capacity; was not
-        # accounted for
-        if new_capacity == 2:
-            resized_table = HashMap(new_capacity, self._hash_function)
-            resized_table._capacity = 2
-
-        # Iterate through and add items
-        for el in range(self._buckets.length()):
-            if self._buckets[el] is not None:
-                resized_table.put(self._buckets[el].key, self._buckets[
-                    el].value)
+        self._finish_rehash()
+        if self._stats is not None:
+            start = perf_counter()
 
-        self._buckets = resized_table._buckets
-        self._capacity = resized_table._capacity
+        # Check if prime; if it is not, use next prime number
+        if not self._is_prime(new_capacity):
+            new_capacity = self._next_prime(new_capacity)
+        # Keep doubling, as put would while adding the entries back, until
+        # the load factor stays below the maximum
+        while self._size - 1 >= self._max_load * new_capacity:
+            new_capacity = self._next_prime(new_capacity * 2)
+
+        new_buckets = self._new_buckets(new_capacity)
+
+        # Iterate through and move live entries using their cached hash; the
+        # new table has no tombstones and keys are unique, so each entry
+        # takes the first empty slot of its probe sequence
+        for el in range(self._buckets.length()):
+            entry = self._buckets[el]
+            if entry is None or entry.is_tombstone:
+                continue
+            if self._robin_hood:
+                self._place_robin_hood(entry, new_buckets, new_capacity)
+                continue
+            probe = entry.hash % new_capacity
+            step = self._first_step(entry.key, new_capacity)
+            while new_buckets[probe] is not None:
+                probe = (probe + step) % new_capacity
+                step += self._step_growth
+            new_buckets[probe] = entry
+
+        self._buckets = new_buckets
+        self._capacity = new_capacity
+        self._tombstones = 0
+        self._written = None
+
+        if self._stats is not None:
+            self._stats.resizes += 1
+            self._stats.resize_seconds += perf_counter() - start
 
     def table_load(self) -> float:
         """
@@ -186,16 +846,12 @@ class HashMap:
 
         :return: object associated with key
         """
-        # Iterate through array
-        for index in range(self._buckets.length()):
-            # If there is an item at the index and it is not a tombstone
-            if self._buckets[index] is not None:
-                if self._buckets[index].key == key and self._buckets[
-                    index].is_tombstone is False:
-                    return self._buckets[index].value   # Return value
-        return None
-
-
+        if self._stats is not None:
+            self._stats.gets += 1
+        entry = self._find_entry(key)
+        if entry is None:
+            return None
+        return entry.value
 
     def contains_key(self, key: str) -> bool:
         """
@@ -205,12 +861,9 @@ class HashMap:
 
         :return: bool representing whether key is in the hash map
         """
-        for index in range(self._capacity):     # Iterate through array
-            if self._buckets[index] is not None:    # If something is at index
-                if self._buckets[index].key == key and \
-                        self._buckets[index].is_tombstone is False:
-                    return True # Return true if matches key and is not TS
-        return False
+        if self._stats is not None:
+            self._stats.gets += 1
+        return self._find_entry(key) is not None
 
     def remove(self, key: str) -> None:
         """
@@ -219,14 +872,126 @@ class HashMap:
 
         :param key: string representing key/item pair to be removed.
         """
+        if self._stats is not None:
+            self._stats.removes += 1
+        if self._old_buckets is not None:
+            self._rehash_step()
+
+        hash_value = self._hash_function(key) & HASH_MASK
+        index = self._find_index(key, hash_value, self._buckets,
+                                 self._capacity)
+        if index != -1:
+            if self._robin_hood:
+                self._shift_out(index)
+            else:
+                self._buckets[index].is_tombstone = True
+                self._tombstones += 1
+            self._size -= 1
+            self._shrink_if_sparse()
+        # Old-table tombstones are dropped with the old table, so they are
+        # not counted
+        elif self._old_buckets is not None:
+            index = self._find_index(key, hash_value, self._old_buckets,
+                                     self._old_capacity)
+            if index != -1:
+                self._old_buckets[index].is_tombstone = True
+                self._size -= 1
+                self._shrink_if_sparse()
+
+    def _find_entry(self, key: str) -> HashEntry:
+        """
+        Returns the live entry for the given key, looking in the old table as
+        well while an incremental resize is in progress.
+
+        :param key: str representing key being searched for
+
+        :return: HashEntry for the key, or None if the key is not present
+        """
+        if self._old_buckets is not None:
+            self._rehash_step()
+
+        hash_value = self._hash_function(key) & HASH_MASK
+        index = self._find_index(key, hash_value, self._buckets,
+                                 self._capacity)
+        if index != -1:
+            return self._buckets[index]
+
+        if self._old_buckets is not None:
+            index = self._find_index(key, hash_value, self._old_buckets,
+                                     self._old_capacity)
+            if index != -1:
+                return self._old_buckets[index]
+        return None
+
+    def _find_index(self, key: str, hash_value: int, buckets: DynamicArray,
+                    capacity: int) -> int:
+        """
+        Follows the same probe sequence used by put, stopping at the first
+        never-used slot, and returns the index of the live entry for the
+        given key.
+
+        :param key: str representing key being searched for
+        :param hash_value: int hash of the key
+        :param buckets: DynamicArray or CompactEntryArray of slots to search
+        :param capacity: int representing the number of slots in buckets
+
+        :return: int index of the entry, or -1 if the key is not present
+        """
+        if self._robin_hood:
+            return self._find_robin_hood(key, hash_value, buckets, capacity)
+
+        probe = hash_value % capacity
+        step = 0
+        # A quadratic probe sequence only visits (capacity + 1) / 2 distinct
+        # slots, so stop once any sequence must have started repeating
+        for _ in range(capacity):
+            entry = buckets[probe]
+            if entry is None:
+                return -1
+            if entry.hash == hash_value and entry.key == key and \
+                    entry.is_tombstone is False:
+                return probe
+            # Only work out the step (a second hash, for double hashing)
+            # once the home slot has been passed
+            if step == 0:
+                step = self._first_step(key, capacity)
+            else:
+                step += self._step_growth
+            probe = (probe + step) % capacity
+        return -1
+
+    @staticmethod
+    def _find_robin_hood(key: str, hash_value: int, buckets: DynamicArray,
+                         capacity: int) -> int:
+        """
+        Robin Hood counterpart of _find_index: walks the linear probe
+        sequence and stops at the first empty slot, or at the first live
+        entry closer to its home slot than the key would be, as the key
+        would have taken that entry's place.
 
-        for index in range(self._capacity): # Iterate through array
-            if self._buckets[index] is not None:    # Something at index
-                if self._buckets[index].key == key and self._buckets[index]\
-                        .is_tombstone is False:
-                    self._buckets[index].is_tombstone = True
-                    self._size -= 1
+        :param key: str representing key being searched for
+        :param hash_value: int hash of the key
+        :param buckets: DynamicArray or CompactEntryArray of slots to search
+        :param capacity: int representing the number of slots in buckets
 
+        :return: int index of the entry, or -1 if the key is not present
+        """
+        index = hash_value % capacity
+        distance = 0
+        while distance < capacity:
+            entry = buckets[index]
+            if entry is None:
+                return -1
+            # Only an old table has tombstones (retired or _MIGRATED
+            # entries); they keep their place in the run
+            if entry.is_tombstone is False:
+                if entry.hash == hash_value and entry.key == key:
+                    return index
+                if (index - entry.hash % capacity) % capacity < distance:
+                    return -1
+            index = (index + 1) % capacity
+            distance += 1
+        return -1
 
     def get_keys_and_values(self) -> DynamicArray:
         """
@@ -235,6 +1000,8 @@ class HashMap:
 
         :return: DynamicArray containing tuples of key/value pairs in hash map
         """
+        self._finish_rehash()
+
         arr = DynamicArray()
         for index in range(self._buckets.length()): # Iterate through hash map
             if self._buckets[index] is not None and self._buckets[index]\
@@ -249,35 +1016,131 @@ class HashMap:
         Clears the contents of the hash map without changing the underlying
         hash table capacity.
         """
-        # Initialize new hashmap
-        new_hash_table = HashMap(self._capacity, self._hash_function)
-        # Associate properties of new_hash_table with self
-        self._buckets = new_hash_table._buckets
-        self._capacity = new_hash_table._capacity
-        self._size = new_hash_table._size
+        # Drop any half-migrated old table
+        self._old_buckets = None
+
+        # Empty the slots in place rather than allocating a new table; only
+        # the slots written since the last clear can be in use, unless too
+        # many were written (or the table was resized) to keep track
+        buckets = self._buckets
+        written = self._written
+        if written is None:
+            for index in range(self._capacity):
+                buckets[index] = None
+            self._written = DynamicArray()
+        else:
+            while written.length() > 0:
+                buckets[written.pop()] = None
+        self._size = 0
+        self._tombstones = 0
 
+    def put_many(self, pairs: DynamicArray) -> None:
+        """
+        Puts every key/value pair of the given array into the hash map, as
+        repeated calls to put would. The table is resized at most once, up
+        front, for the size of the whole batch.
 
-    def __iter__(self):
+        :param pairs: DynamicArray of (key, value) tuples to be inserted
         """
-        Enables the hash map to iterate across itself
+        if self._stats is not None:
+            self._stats.puts += pairs.length()
+        self._finish_rehash()
+        count = pairs.length()
+        if self._size + self._tombstones + count - 1 >= \
+                self._max_load * self._capacity:
+            self.resize_table(max(self._capacity_for(self._size + count,
+                                                     self._max_load),
+                                  self._capacity))
+
+        insert = self._insert
+        hash_function = self._hash_function
+        for index in range(count):
+            key, value = pairs[index]
+            insert(key, value, hash_function(key) & HASH_MASK)
+
+    def get_many(self, keys: DynamicArray) -> DynamicArray:
         """
-        self.index = 0
-        return self
+        Returns a dynamic array holding, at each index, the value associated
+        with the key at the same index of the given array, or None if that
+        key is not in the hash map.
 
-    def __next__(self):
+        :param keys: DynamicArray of keys to be looked up
+
+        :return: DynamicArray of values in the same order as keys
+        """
+        if self._stats is not None:
+            self._stats.gets += keys.length()
+        self._finish_rehash()
+
+        values = DynamicArray()
+        buckets = self._buckets
+        capacity = self._capacity
+        find_index = self._find_index
+        hash_function = self._hash_function
+        for index in range(keys.length()):
+            key = keys[index]
+            slot = find_index(key, hash_function(key) & HASH_MASK, buckets,
+                              capacity)
+            values.append(None if slot == -1 else buckets[slot].value)
+        return values
+
+    def remove_many(self, keys: DynamicArray) -> None:
+        """
+        Removes every key of the given array, and its associated value, from
+        the hash map. Keys that are not in the hash map are ignored.
+
+        :param keys: DynamicArray of keys to be removed
+        """
+        if self._stats is not None:
+            self._stats.removes += keys.length()
+        self._finish_rehash()
+
+        buckets = self._buckets
+        capacity = self._capacity
+        find_index = self._find_index
+        hash_function = self._hash_function
+        for index in range(keys.length()):
+            key = keys[index]
+            slot = find_index(key, hash_function(key) & HASH_MASK, buckets,
+                              capacity)
+            if slot != -1:
+                if self._robin_hood:
+                    self._shift_out(slot)
+                else:
+                    buckets[slot].is_tombstone = True
+                    self._tombstones += 1
+                self._size -= 1
+
+        self._shrink_if_sparse()
+
+    def __iter__(self) -> HashMapIterator:
+        """
+        Returns an iterator over the entries of the hash map, each with key
+        and value attributes
         """
-        Returns the next item in the hash map, based upon the current
-        location of the iterator.
+        self._finish_rehash()
+        return HashMapIterator(self._buckets)
+
+    def keys(self) -> HashMapIterator:
+        """
+        Returns an iterator over the keys in the hash map.
+        """
+        self._finish_rehash()
+        return HashMapIterator(self._buckets, attrgetter('key'))
+
+    def values(self) -> HashMapIterator:
+        """
+        Returns an iterator over the values in the hash map.
+        """
+        self._finish_rehash()
+        return HashMapIterator(self._buckets, attrgetter('value'))
+
+    def items(self) -> HashMapIterator:
+        """
+        Returns an iterator over (key, value) tuples of the hash map.
         """
-        try:
-            value = None
-            # Skip over inactive items
-            while value is None or value.is_tombstone == True:
-                value = self._buckets[self.index] # Item at current index
-                self.index += 1 # Increment index
-        except DynamicArrayException:
-            raise StopIteration
-        return value
+        self._finish_rehash()
+        return HashMapIterator(self._buckets, attrgetter('key', 'value'))
 
 
 # ------------------- BASIC TESTING ---------------------------------------- #
@@ -488,3 +1351,64 @@ if __name__ == "__main__":
     print(m)
     for item in m:
         print('K:', item.key, 'V:', item.value)
+
+    def check(m, keys, expected):
+        """Compare the map with the dict it should match, key by key."""
+        pairs = m.get_keys_and_values()
+        result = m.get_size() == len(expected)
+        result &= dict(pairs[i] for i in range(pairs.length())) == expected
+        for key in keys:
+            result &= m.get(key) == expected.get(key)
+            result &= m.contains_key(key) == (key in expected)
+        return result
+
+    print("\nProbing and storage modes example")
+    print("---------------------------------")
+    # hash_function_1 gives the keys plenty of collisions; removing every
+    # other key exercises the backward-shift delete of Robin Hood probing
+    keys = ['str' + str(i) for i in range(300)]
+    for probing, compact in (('linear', False), ('double', False),
+                             ('robin_hood', False), ('robin_hood', True),
+                             ('quadratic', True)):
+        m = HashMap(11, hash_function_1, probing=probing, compact=compact)
+        expected = {}
+        for i, key in enumerate(keys):
+            m.put(key, i)
+            expected[key] = i
+        for key in keys[::3]:
+            m.put(key, key)
+            expected[key] = key
+        result = check(m, keys, expected)
+        for key in keys[::2]:
+            m.remove(key)
+            del expected[key]
+        result &= check(m, keys, expected)
+        m.resize_table(50)
+        result &= check(m, keys, expected)
+        m.resize_table(2000)
+        result &= check(m, keys, expected)
+        print(probing, compact, m.get_size(), m.get_capacity(), result)
+
+    print("\nIncremental resize example")
+    print("--------------------------")
+    # While a migration is in progress, keys live in both the old and the
+    # new table; look up and remove keys at those moments
+    m = HashMap(11, hash_function_2, incremental=True)
+    keys = ['key' + str(i) for i in range(2000)]
+    expected = {}
+    migrating = 0
+    result = True
+    for i, key in enumerate(keys):
+        m.put(key, i)
+        expected[key] = i
+        if m._old_buckets is not None and i % 7 == 0:
+            migrating += 1
+            removed = keys[i // 3]
+            m.remove(removed)
+            expected.pop(removed, None)
+            result &= m.get(removed) is None and not m.contains_key(removed)
+            result &= m.get(key) == i and m.contains_key(keys[i // 2]) == \
+                (keys[i // 2] in expected)
+            if migrating % 25 == 0:
+                result &= check(m, keys, expected)
+    print(m.get_size(), m.get_capacity(), migrating > 0, result & check(m, keys, expected))
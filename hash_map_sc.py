@@ -1,28 +1,129 @@
 # Description: Implementation of a HashMap using separate chaining
 
 
-from a6_include import (DynamicArray, LinkedList,
-                        hash_function_1, hash_function_2)
+from itertools import permutations
+from multiprocessing import Pool
+from operator import attrgetter
+from time import perf_counter
+
+from a6_include import (DynamicArray, HashMapStats, LinkedList, SLNode,
+                        TreeBucket, add_to_histogram, hash_function_1,
+                        hash_function_2, is_prime, next_prime)
+
+
+# Shared by every bucket that holds no chain yet: an empty LinkedList that is
+# read like any other bucket but never written to, so buckets cost nothing
+# until their first insertion
+_EMPTY_BUCKET = LinkedList()
+
+
+class HashMapIterator:
+    """
+    Iterator over the nodes of a HashMap, walking the chains in place
+    rather than copying them out as get_keys_and_values does. Each iterator
+    keeps its own position, so several can run over the same map at once.
+    The map must not be changed while it is being iterated over.
+    """
+    __slots__ = ('_buckets', '_index', '_node', '_view')
+
+    def __init__(self, buckets: DynamicArray, view: callable = None) -> None:
+        """
+        Initialize new iterator over the given buckets, returning view(node)
+        for each node, or the node itself if view is None.
+        """
+        self._buckets = buckets
+        self._index = 0
+        self._node = None
+        self._view = view
+
+    def __iter__(self) -> "HashMapIterator":
+        """Return the iterator itself."""
+        return self
+
+    def __next__(self):
+        """
+        Returns the next node, or what the view makes of it.
+        """
+        node = self._node
+        if node is None:
+            # Move on to the first node of the next bucket that has one
+            buckets = self._buckets
+            index = self._index
+            length = buckets.length()
+            while node is None:
+                if index == length:
+                    self._index = index
+                    raise StopIteration
+                bucket = buckets[index]
+                index += 1
+                if bucket is not _EMPTY_BUCKET:
+                    node = next(iter(bucket), None)
+            self._index = index
+
+        self._node = node.next
+        if self._view is None:
+            return node
+        return self._view(node)
 
 
 class HashMap:
+    # Number of old buckets migrated per operation during incremental resize;
+    # two is enough to finish before the new table needs to grow again
+    _REHASH_STEP = 2
+
+    # A chain longer than _TREEIFY_THRESHOLD becomes a TreeBucket, which
+    # turns back into a chain once it is down to _UNTREEIFY_THRESHOLD nodes
+    _TREEIFY_THRESHOLD = 8
+    _UNTREEIFY_THRESHOLD = 6
+
     def __init__(self,
                  capacity: int = 11,
-                 function: callable = hash_function_1) -> None:
+                 function: callable = hash_function_1,
+                 incremental: bool = False,
+                 shrink: bool = False,
+                 move_to_front: bool = False) -> None:
         """
         Initialize new HashMap that uses
         separate chaining for collision resolution
-        DO NOT CHANGE THIS METHOD IN ANY WAY
-        """
-        self._buckets = DynamicArray()
 
-        # capacity must be a prime number
+        When incremental is True, growing the table keeps the old buckets
+        alongside the new ones and migrates a bounded number of them on
+        every operation instead of rehashing everything in one put.
+
+        When shrink is True, remove halves the capacity (never below the
+        initial capacity) once the load factor drops under 0.25. As growth
+        happens at 1.0, either resize leaves the load near 0.5, well away
+        from both thresholds.
+
+        When move_to_front is True, every key found in a chain is moved to
+        the chain's head, so with skewed access (a few keys looked up far
+        more often than the rest) the hot keys are found after one or two
+        comparisons. It also reorders get_keys_and_values and iteration.
+        """
+        # capacity must be a prime number; buckets become chains on first
+        # insertion
         self._capacity = self._next_prime(capacity)
-        for _ in range(self._capacity):
-            self._buckets.append(LinkedList())
+        self._buckets = DynamicArray([_EMPTY_BUCKET] * self._capacity)
 
         self._hash_function = function
         self._size = 0
+        # Indices of the buckets given a chain since the last clear, or None
+        # once there are too many to be worth tracking
+        self._written = DynamicArray()
+
+        self._shrink = shrink
+        self._min_capacity = self._capacity
+        self._move_to_front = move_to_front
+
+        # State of an in-progress incremental resize
+        self._incremental = incremental
+        self._old_buckets = None
+        self._old_capacity = 0
+        self._rehash_index = 0
+
+        # HashMapStats once enable_stats is called; every operation checks
+        # for None first, so the counters cost nothing until then
+        self._stats = None
 
     def __str__(self) -> str:
         """
@@ -36,36 +137,46 @@ class HashMap:
 
     def _next_prime(self, capacity: int) -> int:
         """
-        Increment from given number and the find the closest prime number
-        DO NOT CHANGE THIS METHOD IN ANY WAY
+        Increment from given number to find the closest prime number, using
+        the precomputed growth primes where possible
         """
-        if capacity % 2 == 0:
-            capacity += 1
-
-        while not self._is_prime(capacity):
-            capacity += 2
-
-        return capacity
+        return next_prime(capacity)
 
     @staticmethod
     def _is_prime(capacity: int) -> bool:
         """
         Determine if given integer is a prime number and return boolean
-        DO NOT CHANGE THIS METHOD IN ANY WAY
         """
-        if capacity == 2 or capacity == 3:
-            return True
+        return is_prime(capacity)
 
-        if capacity == 1 or capacity % 2 == 0:
-            return False
+    def enable_stats(self) -> None:
+        """
+        Starts keeping statistics of the hash map from zero, see
+        HashMapStats.
+        """
+        self._stats = HashMapStats()
+
+    def disable_stats(self) -> None:
+        """
+        Stops keeping statistics of the hash map.
+        """
+        self._stats = None
 
-        factor = 3
-        while factor ** 2 <= capacity:
-            if capacity % factor == 0:
-                return False
-            factor += 2
+    def get_stats(self) -> HashMapStats:
+        """
+        Returns the statistics kept since enable_stats was called, with the
+        histogram of chain lengths of the table as it is now, or None if
+        statistics are not being kept.
+        """
+        if self._stats is None:
+            return None
+        self._finish_rehash()
 
-        return True
+        chain_lengths = DynamicArray()
+        for index in range(self._capacity):
+            add_to_histogram(chain_lengths, self._buckets[index].length())
+        self._stats.chain_lengths = chain_lengths
+        return self._stats
 
     def get_size(self) -> int:
         """
@@ -81,6 +192,48 @@ class HashMap:
         """
         return self._capacity
 
+    @classmethod
+    def with_expected_size(cls, count: int, function: callable = hash_function_1,
+                           **options) -> "HashMap":
+        """
+        Returns an empty HashMap whose capacity is chosen once, up front, so
+        that count entries can be added without the table being resized.
+
+        :param count: integer representing the expected number of entries
+        :param function: hash function used by the map
+        :param options: keyword options passed on to the constructor
+
+        :return: HashMap with room for count entries
+        """
+        return cls(cls._capacity_for(count), function, **options)
+
+    @classmethod
+    def from_items(cls, items, function: callable = hash_function_1,
+                   **options) -> "HashMap":
+        """
+        Returns a HashMap holding the given key/value pairs, sized once for
+        all of them so no resize happens while they are added.
+
+        :param items: DynamicArray or other iterable of (key, value) tuples
+        :param function: hash function used by the map
+        :param options: keyword options passed on to the constructor
+
+        :return: HashMap containing the pairs
+        """
+        # DynamicArray does not support iteration; copy other iterables into
+        # one so the number of pairs is known before sizing the table
+        if isinstance(items, DynamicArray):
+            pairs = items
+        else:
+            pairs = DynamicArray()
+            for pair in items:
+                pairs.append(pair)
+
+        hash_map = cls.with_expected_size(pairs.length(), function,
+                                          **options)
+        hash_map.put_many(pairs)
+        return hash_map
+
     # ------------------------------------------------------------------ #
 
     def put(self, key: str, value: object) -> None:
@@ -92,29 +245,287 @@ class HashMap:
         :param key: string representing the key of the key/value pair
         :param value: object associated with the key to be inserted
         """
+        if self._stats is not None:
+            self._stats.puts += 1
         if self.table_load() >= 1.0:
-            self.resize_table(self.get_capacity()*2)
+            self._resize(self.get_capacity()*2)
 
         # Get index
-        index = self._hash_function(key) % self._capacity
+        hash_value = self._hash_function(key)
+        index = self._bucket_index(hash_value)
         # Obtain the bucket at the index
         bucket = self._buckets[index]
 
-        # If bucket contains nothing, add key
+        # If bucket was never used, create it
+        if bucket is _EMPTY_BUCKET:
+            bucket = LinkedList()
+            self._buckets[index] = bucket
+            self._track_write(index)
+
+        # Change value if key exists, otherwise add node in the same pass
+        node, found = bucket.find_or_insert(key, hash_value, value,
+                                            self._move_to_front)
+        if found:
+            node.value = value
+            return
+        self._size += 1
+        if bucket.length() > self._TREEIFY_THRESHOLD:
+            self._treeify(self._buckets, index)
+
+    def _upsert(self, key: str, default: object) -> SLNode:
+        """
+        Returns the node holding the given key, first adding the key with
+        the default value if it is not in the hash map. The key is hashed
+        and its chain walked once, so the value can then be read and changed
+        without another lookup.
+
+        :param key: string representing the key to be found or added
+        :param default: object associated with the key if it is added
+
+        :return: SLNode of the key
+        """
+        if self._stats is not None:
+            self._stats.upserts += 1
+        if self.table_load() >= 1.0:
+            self._resize(self.get_capacity()*2)
+
+        hash_value = self._hash_function(key)
+        index = self._bucket_index(hash_value)
+        bucket = self._buckets[index]
+
+        if bucket is _EMPTY_BUCKET:
+            bucket = LinkedList()
+            self._buckets[index] = bucket
+            self._track_write(index)
+
+        node, found = bucket.find_or_insert(key, hash_value, default,
+                                            self._move_to_front)
+        if found:
+            return node
+        self._size += 1
+        if bucket.length() > self._TREEIFY_THRESHOLD:
+            # The tree is built from new nodes, so find the key's one again
+            self._treeify(self._buckets, index)
+            node = self._buckets[index].find(key, hash_value)
+        return node
+
+    def _treeify(self, buckets: DynamicArray, index: int) -> None:
+        """
+        Converts the bucket at the given index into a TreeBucket if it is
+        still a chain. Called once a bucket holds more than
+        _TREEIFY_THRESHOLD nodes, so that poorly spread keys cost O(log n)
+        per lookup rather than O(n).
+
+        :param buckets: DynamicArray of buckets holding the bucket
+        :param index: integer representing the bucket index
+        """
+        bucket = buckets[index]
+        if bucket.__class__ is LinkedList:
+            buckets[index] = TreeBucket(bucket)
+
+    def _shrink_bucket(self, buckets: DynamicArray, index: int) -> None:
+        """
+        After a removal from the bucket at the given index, gives an emptied
+        bucket back to the shared empty bucket, and converts a TreeBucket
+        that has shrunk to _UNTREEIFY_THRESHOLD nodes back into a chain.
+        The gap between the two thresholds keeps a bucket from switching
+        back and forth as one key is put and removed.
+
+        :param buckets: DynamicArray of buckets holding the bucket
+        :param index: integer representing the bucket index
+        """
+        bucket = buckets[index]
         if bucket.length() == 0:
-            bucket.insert(key, value)
-            self._size += 1
-        else:  # If bucket contains list items, iterate for key
-            for node in bucket:
-                if node.key == key:     # Change value if key exists
-                    node.value = value
-                    return
-            bucket.insert(key, value)   # If key not in linked list, add node
-            self._size += 1
+            buckets[index] = _EMPTY_BUCKET
+        elif bucket.__class__ is TreeBucket and \
+                bucket.length() <= self._UNTREEIFY_THRESHOLD:
+            buckets[index] = bucket.to_chain()
+
+    def increment(self, key: str, delta: int = 1) -> int:
+        """
+        Adds delta to the value associated with the given key, which counts
+        as 0 if the key is not in the hash map yet, with one lookup where
+        contains_key, get and put would take three.
+
+        :param key: string representing the key whose value is increased
+        :param delta: number added to the value associated with the key
+
+        :return: the new value associated with the key
+        """
+        node = self._upsert(key, 0)
+        node.value += delta
+        return node.value
+
+    def setdefault(self, key: str, default: object = None) -> object:
+        """
+        Returns the value associated with the given key. If the key is not
+        in the hash map, it is added with the default value first.
+
+        :param key: string representing the key to be looked up
+        :param default: object associated with the key if it is added
+
+        :return: the value associated with the key
+        """
+        return self._upsert(key, default).value
+
+    def update_with(self, key: str, function: callable,
+                    default: object = None) -> object:
+        """
+        Replaces the value associated with the given key by function(value),
+        where value is the default if the key is not in the hash map yet.
+
+        :param key: string representing the key whose value is replaced
+        :param function: callable taking the current value and returning the
+        new one
+        :param default: object passed to function if the key is not present
+
+        :return: the new value associated with the key
+        """
+        node = self._upsert(key, default)
+        node.value = function(node.value)
+        return node.value
+
+    def _track_write(self, index: int) -> None:
+        """
+        Records that the bucket at the given index has been given a chain, so
+        that clear only has to reset the buckets in use. Tracking stops once
+        a quarter of the buckets have chains; clear then resets every bucket.
+
+        :param index: integer representing the bucket index
+        """
+        written = self._written
+        if written is not None:
+            if written.length() < self._capacity // 4:
+                written.append(index)
+            else:
+                self._written = None
+
+    def _bucket_index(self, hash_value: int) -> int:
+        """
+        Returns the index of the bucket for the given key hash. If an
+        incremental resize is in progress, the key's old bucket and a bounded
+        number of further old buckets are first moved into the new table.
+
+        :param hash_value: integer hash of the key being looked up
+
+        :return: int representing the bucket index in the current table
+        """
+        if self._old_buckets is not None:
+            if self._stats is not None:
+                start = perf_counter()
+            self._migrate_bucket(hash_value % self._old_capacity)
+            self._rehash_step()
+            if self._stats is not None:
+                self._stats.resize_seconds += perf_counter() - start
+        return hash_value % self._capacity
+
+    def _resize(self, new_capacity: int) -> None:
+        """
+        Resizes the table as chosen at construction: incrementally or all at
+        once with resize_table.
+
+        :param new_capacity: integer representing the requested capacity
+        """
+        if self._incremental:
+            self._start_rehash(new_capacity)
+        else:
+            self.resize_table(new_capacity)
+
+    def _shrink_if_sparse(self) -> None:
+        """
+        If shrinking is enabled and the load factor has dropped under 0.25,
+        halves the capacity as many times as needed to bring it back up,
+        but not below the initial capacity.
+        """
+        if not self._shrink:
+            return
+
+        new_capacity = self._capacity
+        while new_capacity > self._min_capacity and \
+                self._size / new_capacity < 0.25:
+            new_capacity = max(new_capacity // 2, self._min_capacity)
+        if new_capacity != self._capacity:
+            self._resize(new_capacity)
+
+    @staticmethod
+    def _capacity_for(count: int) -> int:
+        """
+        Returns the smallest capacity that holds count entries without put
+        having to grow the table.
+
+        :param count: integer representing the number of entries
+
+        :return: integer representing the capacity
+        """
+        return count
+
+    def _start_rehash(self, new_capacity: int) -> None:
+        """
+        Begins an incremental resize: the current buckets become the old
+        table and an empty table of the new capacity takes their place.
+        Buckets of the new table are created when first written.
 
-        return
+        :param new_capacity: integer representing the requested capacity
+        """
+        self._finish_rehash()
+        if self._stats is not None:
+            self._stats.resizes += 1
+
+        self._old_buckets = self._buckets
+        self._old_capacity = self._capacity
+        self._rehash_index = 0
+
+        self._capacity = self._next_prime(new_capacity)
+        self._buckets = DynamicArray([_EMPTY_BUCKET] * self._capacity)
+        self._written = None
+
+    def _migrate_bucket(self, index: int) -> None:
+        """
+        Moves every node of the old bucket at the given index into the new
+        table and marks the old bucket as migrated.
+
+        :param index: integer representing the old bucket index
+        """
+        bucket = self._old_buckets[index]
+        if bucket is _EMPTY_BUCKET:
+            return
+        self._old_buckets[index] = _EMPTY_BUCKET
+
+        for node in bucket:
+            new_index = node.hash % self._capacity
+            new_bucket = self._buckets[new_index]
+            if new_bucket is _EMPTY_BUCKET:
+                new_bucket = LinkedList()
+                self._buckets[new_index] = new_bucket
+            new_bucket.insert(node.key, node.value, node.hash)
+            if new_bucket.length() > self._TREEIFY_THRESHOLD:
+                self._treeify(self._buckets, new_index)
+
+    def _rehash_step(self) -> None:
+        """
+        Migrates the next _REHASH_STEP old buckets, dropping the old table
+        once all of its buckets have been moved.
+        """
+        end = min(self._rehash_index + self._REHASH_STEP, self._old_capacity)
+        for index in range(self._rehash_index, end):
+            self._migrate_bucket(index)
+        self._rehash_index = end
 
+        if end == self._old_capacity:
+            self._old_buckets = None
 
+    def _finish_rehash(self) -> None:
+        """
+        Completes any in-progress incremental resize.
+        """
+        if self._old_buckets is not None:
+            if self._stats is not None:
+                start = perf_counter()
+            for index in range(self._rehash_index, self._old_capacity):
+                self._migrate_bucket(index)
+            self._old_buckets = None
+            if self._stats is not None:
+                self._stats.resize_seconds += perf_counter() - start
 
     def resize_table(self, new_capacity: int) -> None:
         """
@@ -128,30 +539,40 @@ class HashMap:
         if new_capacity < 1:
             return
 
-        if new_capacity >= 1:
-            # Check if prime; if it is, use for new capacity
-            if self._is_prime(new_capacity):
-                resized_table = HashMap(new_capacity, self._hash_function)
+        self._finish_rehash()
+        if self._stats is not None:
+            start = perf_counter()
 
-            else:
-                # If not prime, use next prime number
-                resized_table = HashMap(self._next_prime(new_capacity),
-                                        self._hash_function)
-        # If new_capacity is 2, a prime number, set as capacity; was not
-        # accounted for
-        if new_capacity == 2:
-            resized_table = HashMap(new_capacity, self._hash_function)
-            resized_table._capacity = 2
+        # Check if prime; if it is not, use next prime number
+        if not self._is_prime(new_capacity):
+            new_capacity = self._next_prime(new_capacity)
+        # Keep doubling, as put would while adding the entries back, until
+        # the load factor stays below 1.0
+        while new_capacity < self._size:
+            new_capacity = self._next_prime(new_capacity * 2)
+
+        # Buckets of the new table become chains as nodes are moved in
+        new_buckets = DynamicArray([_EMPTY_BUCKET] * new_capacity)
 
         for index in range(self._capacity):
-            # If bucket contains nodes, put key & value in resized table
-            if self._buckets[index] is not None:
+            # If bucket contains nodes, move them using their cached hash
+            if self._buckets[index] is not _EMPTY_BUCKET:
                 for node in self._buckets[index]:
-                    resized_table.put(node.key, node.value)
-        self._buckets = resized_table._buckets
-        self._capacity = resized_table._capacity
-
-
+                    new_index = node.hash % new_capacity
+                    new_bucket = new_buckets[new_index]
+                    if new_bucket is _EMPTY_BUCKET:
+                        new_bucket = LinkedList()
+                        new_buckets[new_index] = new_bucket
+                    new_bucket.insert(node.key, node.value, node.hash)
+                    if new_bucket.length() > self._TREEIFY_THRESHOLD:
+                        self._treeify(new_buckets, new_index)
+        self._buckets = new_buckets
+        self._capacity = new_capacity
+        self._written = None
+
+        if self._stats is not None:
+            self._stats.resizes += 1
+            self._stats.resize_seconds += perf_counter() - start
 
     def table_load(self) -> float:
         """
@@ -168,9 +589,13 @@ class HashMap:
 
         :return: int representing number of buckets in hash table
         """
+        self._finish_rehash()
+
+        # Emptied chains are replaced by the shared empty bucket, so only
+        # buckets holding nodes are not _EMPTY_BUCKET
         num_empty = 0
         for index in range(self._capacity):
-            if self._buckets[index].length() == 0:
+            if self._buckets[index] is _EMPTY_BUCKET:
                 num_empty += 1
         return num_empty
 
@@ -182,18 +607,16 @@ class HashMap:
         :param key: string representing the key for which the value will be
         returned
         """
-        # Get index
-        index = self._hash_function(key) % self._capacity
-        # Obtain the bucket at the index
-        bucket = self._buckets[index]
-
-        # Iterate through linked list at index and obtain value of node if
-        # present
-        for node in bucket:
-            if node.key == key:
-                return node.value
-
-        return None
+        if self._stats is not None:
+            self._stats.gets += 1
+        # Obtain the bucket for the key
+        hash_value = self._hash_function(key)
+        bucket = self._buckets[self._bucket_index(hash_value)]
+        # Obtain value of node if present
+        node = bucket.find(key, hash_value, self._move_to_front)
+        if node is None:
+            return None
+        return node.value
 
     def contains_key(self, key: str) -> bool:
         """
@@ -203,19 +626,16 @@ class HashMap:
 
         :return: boolean representing whether key is in hash map
         """
+        if self._stats is not None:
+            self._stats.gets += 1
         # If empty hash map
         if self._size == 0:
             return False
 
-        # Get index
-        index = self._hash_function(key) % self._capacity
-        # Obtain the bucket at the index
-        bucket = self._buckets[index]
-
-        for node in bucket:
-            if node.key == key:
-                return True
-        return False
+        # Obtain the bucket for the key
+        hash_value = self._hash_function(key)
+        bucket = self._buckets[self._bucket_index(hash_value)]
+        return bucket.find(key, hash_value, self._move_to_front) is not None
 
 
     def remove(self, key: str) -> None:
@@ -225,16 +645,21 @@ class HashMap:
 
         :param key: string representing key for which its value will be removed
         """
+        if self._stats is not None:
+            self._stats.removes += 1
 
-        # Get index
-        index = self._hash_function(key) % self._capacity
-        # Obtain the bucket at the index
+        # Obtain the bucket for the key
+        hash_value = self._hash_function(key)
+        index = self._bucket_index(hash_value)
         bucket = self._buckets[index]
+        if bucket is _EMPTY_BUCKET:
+            return
 
-        for node in bucket:
-            if node.key == key:
-                bucket.remove(key)
-                self._size -= 1
+        # Find and unlink the node in one pass over the chain
+        if bucket.unlink(key, hash_value) is not None:
+            self._size -= 1
+            self._shrink_bucket(self._buckets, index)
+            self._shrink_if_sparse()
 
 
 
@@ -248,10 +673,14 @@ class HashMap:
         the hash map.
         """
 
+        self._finish_rehash()
+
         new_array = DynamicArray()
         # Iterate through each item and obtain corresponding key/value pair
         # before adding to new_array
         for index in range(self._capacity):
+            if self._buckets[index] is _EMPTY_BUCKET:
+                continue
             for bucket in self._buckets[index]:
                 new_array.append((bucket.key, bucket.value))
         return new_array
@@ -262,19 +691,164 @@ class HashMap:
         Clears the contents of the hash map without changing the underlying
         hash table capacity.
         """
-        # Obtain old capacity
-        table_capacity = self._capacity
+        # Drop any half-migrated old table
+        self._old_buckets = None
+
+        # Return buckets to the shared empty bucket in place rather than
+        # allocating a new table; only the buckets given a chain since the
+        # last clear can be in use, unless too many were (or the table was
+        # resized) to keep track
+        buckets = self._buckets
+        written = self._written
+        if written is None:
+            for index in range(self._capacity):
+                buckets[index] = _EMPTY_BUCKET
+            self._written = DynamicArray()
+        else:
+            while written.length() > 0:
+                buckets[written.pop()] = _EMPTY_BUCKET
+        self._size = 0
+
+    def put_many(self, pairs: DynamicArray) -> None:
+        """
+        Puts every key/value pair of the given array into the hash map, as
+        repeated calls to put would. The table is resized at most once, up
+        front, for the size of the whole batch.
+
+        :param pairs: DynamicArray of (key, value) tuples to be inserted
+        """
+        if self._stats is not None:
+            self._stats.puts += pairs.length()
+        self._finish_rehash()
+        needed = self._capacity_for(self._size + pairs.length())
+        if needed > self._capacity:
+            self.resize_table(needed)
+
+        buckets = self._buckets
+        capacity = self._capacity
+        hash_function = self._hash_function
+        move_to_front = self._move_to_front
+        for index in range(pairs.length()):
+            key, value = pairs[index]
+            hash_value = hash_function(key)
+            bucket_index = hash_value % capacity
+            bucket = buckets[bucket_index]
+            if bucket is _EMPTY_BUCKET:
+                bucket = LinkedList()
+                buckets[bucket_index] = bucket
+                self._track_write(bucket_index)
+
+            # Change value if key exists, otherwise add node
+            node, found = bucket.find_or_insert(key, hash_value, value,
+                                                move_to_front)
+            if found:
+                node.value = value
+            else:
+                self._size += 1
+                if bucket.length() > self._TREEIFY_THRESHOLD:
+                    self._treeify(buckets, bucket_index)
+
+    def get_many(self, keys: DynamicArray) -> DynamicArray:
+        """
+        Returns a dynamic array holding, at each index, the value associated
+        with the key at the same index of the given array, or None if that
+        key is not in the hash map.
+
+        :param keys: DynamicArray of keys to be looked up
+
+        :return: DynamicArray of values in the same order as keys
+        """
+        if self._stats is not None:
+            self._stats.gets += keys.length()
+        self._finish_rehash()
+
+        values = DynamicArray()
+        buckets = self._buckets
+        capacity = self._capacity
+        hash_function = self._hash_function
+        move_to_front = self._move_to_front
+        for index in range(keys.length()):
+            key = keys[index]
+            hash_value = hash_function(key)
+            bucket = buckets[hash_value % capacity]
+
+            node = bucket.find(key, hash_value, move_to_front)
+            values.append(None if node is None else node.value)
+        return values
+
+    def remove_many(self, keys: DynamicArray) -> None:
+        """
+        Removes every key of the given array, and its associated value, from
+        the hash map. Keys that are not in the hash map are ignored.
+
+        :param keys: DynamicArray of keys to be removed
+        """
+        if self._stats is not None:
+            self._stats.removes += keys.length()
+        self._finish_rehash()
+
+        buckets = self._buckets
+        capacity = self._capacity
+        hash_function = self._hash_function
+        for index in range(keys.length()):
+            key = keys[index]
+            hash_value = hash_function(key)
+            bucket_index = hash_value % capacity
+            bucket = buckets[bucket_index]
+            if bucket is not _EMPTY_BUCKET and \
+                    bucket.unlink(key, hash_value) is not None:
+                self._size -= 1
+                self._shrink_bucket(buckets, bucket_index)
+
+        self._shrink_if_sparse()
+
+    def __iter__(self) -> HashMapIterator:
+        """
+        Returns an iterator over the nodes of the hash map, each with key
+        and value attributes.
+        """
+        self._finish_rehash()
+        return HashMapIterator(self._buckets)
+
+    def keys(self) -> HashMapIterator:
+        """
+        Returns an iterator over the keys in the hash map.
+        """
+        self._finish_rehash()
+        return HashMapIterator(self._buckets, attrgetter('key'))
+
+    def values(self) -> HashMapIterator:
+        """
+        Returns an iterator over the values in the hash map.
+        """
+        self._finish_rehash()
+        return HashMapIterator(self._buckets, attrgetter('value'))
+
+    def items(self) -> HashMapIterator:
+        """
+        Returns an iterator over (key, value) tuples of the hash map.
+        """
+        self._finish_rehash()
+        return HashMapIterator(self._buckets, attrgetter('key', 'value'))
+
 
-        # Initialize new hash table
-        new_hash_table = HashMap(table_capacity, self._hash_function)
-        # Set new_hash_table values for hash table at issue
-        self._buckets = new_hash_table._buckets
-        self._size = new_hash_table._size
-        self._capacity = new_hash_table._capacity
+def _count_values(da: DynamicArray) -> DynamicArray:
+    """
+    Counts how many times each value occurs in the given array. Run in the
+    worker processes of find_mode.
+
+    :param da: DynamicArray of values to be counted
 
+    :return: DynamicArray of (value, count) tuples
+    """
+    counts = HashMap()
+    for index in range(da.length()):
+        counts.increment(da[index])
+    return counts.get_keys_and_values()
 
 
-def find_mode(da: DynamicArray) -> tuple[DynamicArray, int]:
+def find_mode(da: DynamicArray, processes: int = 1) \
+        -> tuple[DynamicArray, int]:
     """
     Receives a dynamic array and returns a tuple containing 1) dynamic array
     comprising the mode (mostly occurring) value of the given array, and (2)
@@ -282,43 +856,51 @@ def find_mode(da: DynamicArray) -> tuple[DynamicArray, int]:
     value.
 
     :param da: DynamicArray to for which mode will be obtained
+    :param processes: number of worker processes counting chunks of da in
+    parallel, whose counts are then merged; 1 counts in this process
 
     :return: tuple of a DynamicArray containing the mode and integer
     representing the highest frequency of occurrence for the mode.
     """
-
-    map = HashMap()
+    # Map each value in da to the number of times it occurs
+    if processes > 1:
+        # A few chunks per process even out the work if some chunks hold
+        # more distinct values than others
+        chunk_size = max(1, -(-da.length() // (processes * 4)))
+        chunks = []
+        for start in range(0, da.length(), chunk_size):
+            chunk = DynamicArray()
+            for index in range(start, min(start + chunk_size, da.length())):
+                chunk.append(da[index])
+            chunks.append(chunk)
+
+        map = HashMap()
+        with Pool(processes) as pool:
+            # imap hands back the counts in chunk order, so the order of
+            # the modes does not depend on which worker finishes first
+            for counts in pool.imap(_count_values, chunks):
+                for index in range(counts.length()):
+                    value, count = counts[index]
+                    map.increment(value, count)
+        frequency_list = map.get_keys_and_values()
+    else:
+        frequency_list = _count_values(da)
+
+    # Find the highest frequency and the values that have it in one pass,
+    # starting the list over whenever a higher frequency turns up
     mode_list = DynamicArray()
-    # Put items in da in map, with a value representing number of times
-    # value has occurred.
-    for index in range(da.length()):
-        if map.contains_key(da[index]) is False:
-            map.put(da[index], 1)
-        else:
-            map.put(da[index], map.get(da[index]) + 1)
-
-    # Create new array containing keys and associated frequencies. Find
-    # highest frequency.
     frequency = 0
-    frequency_list = map.get_keys_and_values()
-    # If iterated frequency is higher than current frequency, make new
-    # frequency
-    for index in range(frequency_list.length()):
-        if frequency < frequency_list[index][1]:
-            frequency = frequency_list[index][1]
-
-    # Iterate through frequency array, and if associate frequency equals
-    # designated highest frequency, add to list
     for index in range(frequency_list.length()):
-        if frequency_list[index][1] == frequency:
-            mode_list.append(frequency_list[index][0])
+        value, count = frequency_list[index]
+        if count > frequency:
+            mode_list = DynamicArray()
+            frequency = count
+        if count == frequency:
+            mode_list.append(value)
 
     return mode_list, frequency
 
 
-
-
-
 # ------------------- BASIC TESTING ---------------------------------------- #
 
 if __name__ == "__main__":
@@ -519,3 +1101,70 @@ if __name__ == "__main__":
         da = DynamicArray(case)
         mode, frequency = find_mode(da)
         print(f"Input: {da}\nMode : {mode}, Frequency: {frequency}\n")
+
+    print("\nTree bucket example")
+    print("-------------------")
+    # Anagrams share their hash under hash_function_1, so they all land in
+    # one bucket: a chain until _TREEIFY_THRESHOLD keys, then a TreeBucket
+    # until removals bring it down to _UNTREEIFY_THRESHOLD
+    m = HashMap(11, hash_function_1)
+    keys = [''.join(p) for p in permutations('abcde')]
+    expected = {}
+
+    def bucket_type():
+        index = hash_function_1(keys[0]) % m.get_capacity()
+        return type(m._buckets[index]).__name__
+
+    def check():
+        pairs = m.get_keys_and_values()
+        result = m.get_size() == len(expected)
+        result &= dict(pairs[i] for i in range(pairs.length())) == expected
+        for key in keys:
+            result &= m.get(key) == expected.get(key)
+            result &= m.contains_key(key) == (key in expected)
+        return result
+
+    for i, key in enumerate(keys):
+        m.put(key, i)
+        expected[key] = i
+        if m.get_size() in (HashMap._TREEIFY_THRESHOLD,
+                            HashMap._TREEIFY_THRESHOLD + 1):
+            print(m.get_size(), bucket_type(), check())
+    # Replace every other value
+    for key in keys[::2]:
+        m.put(key, key.upper())
+        expected[key] = key.upper()
+    print(m.get_size(), bucket_type(), check())
+
+    # Remove in a scrambled order, so inner tree nodes go as well as leaves
+    for step in range(len(keys) - 5):
+        key = keys[step * 7 % len(keys)]
+        m.remove(key)
+        del expected[key]
+        if m.get_size() in (60, HashMap._UNTREEIFY_THRESHOLD + 1,
+                            HashMap._UNTREEIFY_THRESHOLD, 5):
+            print(m.get_size(), bucket_type(), check())
+
+    print("\nIncremental resize example")
+    print("--------------------------")
+    # While a migration is in progress, keys live in both the old and the
+    # new buckets; look up and remove keys at those moments
+    m = HashMap(11, hash_function_2, incremental=True)
+    keys = ['key' + str(i) for i in range(2000)]
+    expected = {}
+    migrating = 0
+    result = True
+    for i, key in enumerate(keys):
+        m.put(key, i)
+        expected[key] = i
+        if m._old_buckets is not None and i % 7 == 0:
+            migrating += 1
+            removed = keys[i // 3]
+            m.remove(removed)
+            expected.pop(removed, None)
+            result &= m.get(removed) is None and not m.contains_key(removed)
+            result &= m.get(key) == i and m.contains_key(keys[i // 2]) == \
+                (keys[i // 2] in expected)
+            if migrating % 25 == 0:
+                result &= check()
+    print(m.get_size(), m.get_capacity(), migrating > 0, result & check())
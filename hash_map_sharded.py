@@ -0,0 +1,394 @@
+# Description: HashMap split into shards by key hash, each held by its own
+#              worker process, for work that one core cannot keep up with
+
+import os
+from multiprocessing import Pipe, Process
+
+from a6_include import DynamicArray, hash_function_1
+from hash_map_sc import HashMap
+
+
+def _serve_shard(connection, capacity: int, function: callable) -> None:
+    """
+    Runs in each worker process: applies every request received on the
+    connection to the shard's own HashMap and sends back the result, until
+    asked to close.
+    """
+    shard = HashMap(capacity, function)
+    while True:
+        command, argument = connection.recv()
+        reply = None
+        if command == 'put_many':
+            shard.put_many(argument)
+        elif command == 'get_many':
+            reply = shard.get_many(argument)
+        elif command == 'contains_many':
+            reply = DynamicArray()
+            for index in range(argument.length()):
+                reply.append(shard.contains_key(argument[index]))
+        elif command == 'remove_many':
+            shard.remove_many(argument)
+        elif command == 'count':
+            # Add one to the count of each value
+            for index in range(argument.length()):
+                shard.increment(argument[index])
+        elif command == 'mode':
+            reply = _local_mode(shard)
+        elif command == 'get_size':
+            reply = shard.get_size()
+        elif command == 'get_keys_and_values':
+            reply = shard.get_keys_and_values()
+        elif command == 'clear':
+            shard.clear()
+        elif command == 'close':
+            connection.close()
+            return
+        connection.send(reply)
+
+
+def _local_mode(shard: HashMap) -> tuple:
+    """
+    Returns the keys of the shard with the highest count, and that count,
+    in one pass over the shard.
+    """
+    mode_list = DynamicArray()
+    frequency = 0
+    for value, count in shard.items():
+        if count > frequency:
+            mode_list = DynamicArray()
+            frequency = count
+        if count == frequency:
+            mode_list.append(value)
+    return mode_list, frequency
+
+
+class ShardedHashMap:
+    """
+    Map whose keys are split by hash between `shards` worker processes,
+    each holding a separate chaining HashMap of its own, so batches of
+    operations are worked through on several cores at once.
+
+    Requests and their results travel over one pipe per worker. Batch
+    methods send every shard its part of the batch before waiting for any
+    reply; single-key methods cost a round trip each and are only there
+    for convenience.
+
+    Keys and values must be picklable, and so must the hash function (a
+    module-level function such as those in a6_include). Call close, or use
+    the map in a with statement, to stop the workers.
+    """
+
+    def __init__(self,
+                 shards: int = None,
+                 capacity: int = 11,
+                 function: callable = hash_function_1) -> None:
+        """
+        Starts one worker process per shard, each with a HashMap of the
+        given capacity and hash function. shards defaults to the number of
+        CPUs.
+        """
+        self._shards = shards or os.cpu_count() or 1
+        self._hash_function = function
+        self._connections = DynamicArray()
+        self._workers = DynamicArray()
+        for _ in range(self._shards):
+            parent_end, worker_end = Pipe()
+            worker = Process(target=_serve_shard,
+                             args=(worker_end, capacity, function),
+                             daemon=True)
+            worker.start()
+            worker_end.close()
+            self._connections.append(parent_end)
+            self._workers.append(worker)
+
+    def __enter__(self) -> "ShardedHashMap":
+        """Return the map itself for use in a with statement."""
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        """Stop the workers on leaving a with statement."""
+        self.close()
+
+    def close(self) -> None:
+        """
+        Stops every worker process. The map cannot be used afterwards.
+        """
+        for shard in range(self._connections.length()):
+            self._connections[shard].send(('close', None))
+            self._connections[shard].close()
+            self._workers[shard].join()
+        self._connections = DynamicArray()
+        self._workers = DynamicArray()
+
+    def _shard_of(self, key: str) -> int:
+        """
+        Returns the index of the shard that holds the given key.
+        """
+        return self._hash_function(key) % self._shards
+
+    def _request_all(self, command: str, arguments: DynamicArray = None) \
+            -> DynamicArray:
+        """
+        Sends the command to every shard, with the argument at the shard's
+        index of arguments if given, and then collects the replies.
+
+        :return: DynamicArray of the replies, in shard order
+        """
+        for shard in range(self._shards):
+            argument = None if arguments is None else arguments[shard]
+            self._connections[shard].send((command, argument))
+        replies = DynamicArray()
+        for shard in range(self._shards):
+            replies.append(self._connections[shard].recv())
+        return replies
+
+    def _split(self, items: DynamicArray, key_of: callable) -> tuple:
+        """
+        Splits items between the shards by the hash of key_of(item).
+
+        :return: tuple of a DynamicArray holding each shard's DynamicArray of
+        items, and a DynamicArray of the shard of each item
+        """
+        parts = DynamicArray()
+        for _ in range(self._shards):
+            parts.append(DynamicArray())
+        shard_of_item = DynamicArray()
+        for index in range(items.length()):
+            item = items[index]
+            shard = self._shard_of(key_of(item))
+            parts[shard].append(item)
+            shard_of_item.append(shard)
+        return parts, shard_of_item
+
+    def _request_by_key(self, command: str, keys: DynamicArray) \
+            -> DynamicArray:
+        """
+        Sends every shard the command with its part of keys, and puts the
+        answers back in the order of keys.
+
+        :return: DynamicArray of one answer per key
+        """
+        parts, shard_of_key = self._split(keys, lambda key: key)
+        replies = self._request_all(command, parts)
+
+        # Each shard answers in the order its keys were sent
+        positions = DynamicArray([0] * self._shards)
+        answers = DynamicArray()
+        for index in range(keys.length()):
+            shard = shard_of_key[index]
+            answers.append(replies[shard][positions[shard]])
+            positions[shard] = positions[shard] + 1
+        return answers
+
+    # ------------------------------------------------------------------ #
+
+    def put_many(self, pairs: DynamicArray) -> None:
+        """
+        Puts every key/value pair of the given array into the map.
+
+        :param pairs: DynamicArray of (key, value) tuples to be inserted
+        """
+        parts, _ = self._split(pairs, lambda pair: pair[0])
+        self._request_all('put_many', parts)
+
+    def get_many(self, keys: DynamicArray) -> DynamicArray:
+        """
+        Returns a dynamic array holding, at each index, the value associated
+        with the key at the same index of the given array, or None if that
+        key is not in the map.
+
+        :param keys: DynamicArray of keys to be looked up
+
+        :return: DynamicArray of values in the same order as keys
+        """
+        return self._request_by_key('get_many', keys)
+
+    def contains_many(self, keys: DynamicArray) -> DynamicArray:
+        """
+        Returns a dynamic array holding, at each index, True if the key at
+        the same index of the given array is in the map (even with the
+        value None), otherwise False.
+
+        :param keys: DynamicArray of keys to be looked up
+
+        :return: DynamicArray of booleans in the same order as keys
+        """
+        return self._request_by_key('contains_many', keys)
+
+    def remove_many(self, keys: DynamicArray) -> None:
+        """
+        Removes every key of the given array, and its associated value, from
+        the map. Keys that are not in the map are ignored.
+
+        :param keys: DynamicArray of keys to be removed
+        """
+        parts, _ = self._split(keys, lambda key: key)
+        self._request_all('remove_many', parts)
+
+    def put(self, key: str, value: object) -> None:
+        """
+        Updates key/value pair in the map.
+
+        :param key: string representing the key of the key/value pair
+        :param value: object associated with the key to be inserted
+        """
+        self.put_many(DynamicArray([(key, value)]))
+
+    def get(self, key: str) -> object:
+        """
+        Returns the value associated with the given key, or None if the key
+        is not in the map.
+
+        :param key: string representing the key to look up
+        """
+        return self.get_many(DynamicArray([key]))[0]
+
+    def contains_key(self, key: str) -> bool:
+        """
+        Returns True if key is in the map, otherwise returns False.
+
+        :param key: string representing key being searched for
+        """
+        return self.contains_many(DynamicArray([key]))[0]
+
+    def remove(self, key: str) -> None:
+        """
+        Removes the given key and its associated value from the map.
+
+        :param key: string representing key to be removed
+        """
+        self.remove_many(DynamicArray([key]))
+
+    def get_size(self) -> int:
+        """
+        Return the number of keys in all shards.
+        """
+        sizes = self._request_all('get_size')
+        size = 0
+        for shard in range(sizes.length()):
+            size += sizes[shard]
+        return size
+
+    def get_keys_and_values(self) -> DynamicArray:
+        """
+        Returns a dynamic array where each index contains a tuple of a
+        key/value pair stored in the map, shard by shard.
+        """
+        replies = self._request_all('get_keys_and_values')
+        pairs = DynamicArray()
+        for shard in range(replies.length()):
+            for index in range(replies[shard].length()):
+                pairs.append(replies[shard][index])
+        return pairs
+
+    def clear(self) -> None:
+        """
+        Clears the contents of every shard.
+        """
+        self._request_all('clear')
+
+    def count_many(self, values: DynamicArray) -> None:
+        """
+        Adds one to the count stored for each value of the given array
+        (which starts at zero), as find_mode does. Each shard counts its own
+        values while the next chunk is being split off.
+
+        :param values: DynamicArray of values to be counted
+        """
+        chunk = 65536
+        waiting = DynamicArray([False] * self._shards)
+        for start in range(0, values.length(), chunk):
+            part = DynamicArray()
+            for index in range(start, min(start + chunk, values.length())):
+                part.append(values[index])
+            parts, _ = self._split(part, lambda value: value)
+
+            for shard in range(self._shards):
+                # Let each shard finish its last chunk before sending the
+                # next, so the pipes never hold more than one
+                if waiting[shard]:
+                    self._connections[shard].recv()
+                self._connections[shard].send(('count', parts[shard]))
+                waiting[shard] = True
+
+        for shard in range(self._shards):
+            if waiting[shard]:
+                self._connections[shard].recv()
+
+    def mode(self) -> tuple:
+        """
+        Returns a tuple of a DynamicArray of the keys with the highest
+        count, and that count. Every key is in one shard only, so the
+        shards' own modes are the only candidates.
+        """
+        replies = self._request_all('mode')
+        mode_list = DynamicArray()
+        frequency = 0
+        for shard in range(replies.length()):
+            shard_modes, shard_frequency = replies[shard]
+            if shard_frequency > frequency:
+                mode_list = DynamicArray()
+                frequency = shard_frequency
+            if shard_frequency == frequency:
+                for index in range(shard_modes.length()):
+                    mode_list.append(shard_modes[index])
+        return mode_list, frequency
+
+
+def find_mode(da: DynamicArray, shards: int = None) \
+        -> tuple[DynamicArray, int]:
+    """
+    Receives a dynamic array and returns a tuple containing 1) dynamic array
+    comprising the mode (mostly occurring) value of the given array, and (2)
+    an integer representing the highest frequency of occurrence for the mode
+    value, counting on several worker processes.
+
+    :param da: DynamicArray to for which mode will be obtained
+    :param shards: number of worker processes, the number of CPUs if None
+
+    :return: tuple of a DynamicArray containing the mode and integer
+    representing the highest frequency of occurrence for the mode.
+    """
+    with ShardedHashMap(shards) as counts:
+        counts.count_many(da)
+        return counts.mode()
+
+
+# ------------------- BASIC TESTING ---------------------------------------- #
+
+if __name__ == "__main__":
+
+    print("\nPDF - find_mode example 1")
+    print("-----------------------------")
+    da = DynamicArray(["apple", "apple", "grape", "melon", "peach"])
+    mode, frequency = find_mode(da, 2)
+    print(f"Input: {da}\nMode : {mode}, Frequency: {frequency}")
+
+    print("\nPDF - find_mode example 2")
+    print("-----------------------------")
+    test_cases = (
+        ["Arch", "Manjaro", "Manjaro", "Mint", "Mint", "Mint", "Ubuntu",
+         "Ubuntu", "Ubuntu"],
+        ["one", "two", "three", "four", "five"],
+        ["2", "4", "2", "6", "8", "4", "1", "3", "4", "5", "7", "3", "3", "2"]
+    )
+
+    for case in test_cases:
+        da = DynamicArray(case)
+        mode, frequency = find_mode(da, 3)
+        print(f"Input: {da}\nMode : {mode}, Frequency: {frequency}\n")
+
+    print("\nBatch operations")
+    print("----------------")
+    with ShardedHashMap(3) as m:
+        pairs = DynamicArray([('key' + str(i), i) for i in range(1000)])
+        m.put_many(pairs)
+        keys = DynamicArray(['key' + str(i) for i in range(0, 1100, 100)])
+        print(m.get_size(), m.get_many(keys))
+        m.remove_many(keys)
+        print(m.get_size(), m.get('key100'), m.get('key101'),
+              m.contains_key('key999'))
+        # A key stored with the value None is still in the map
+        m.put('none', None)
+        print(m.get_size(), m.get('none'), m.contains_key('none'),
+              m.contains_key('key100'))